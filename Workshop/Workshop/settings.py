@@ -47,6 +47,8 @@ INSTALLED_APPS = [
     'coupons.apps.CouponsConfig',
     'forum.apps.ForumConfig',
     'payment.apps.PaymentConfig',
+    'api.apps.ApiConfig',
+    'outbox.apps.OutboxConfig',
     'django_filters',
     'rest_framework'
 ]
@@ -57,6 +59,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'shop.middleware.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,18 +97,50 @@ BRAINTREE_MERCHANT_ID = os.environ.get("BRAINTREE_MERCHANT", default='XXX')
 BRAINTREE_PUBLIC_KEY = os.environ.get("BRAINTREE_PUBLIC_KEY", default='XXX')   
 BRAINTREE_PRIVATE_KEY = os.environ.get("BRAINTREE_PRIVATE_KEY", default='XXX') 
 
+BRAINTREE_TIMEOUT = int(os.environ.get("BRAINTREE_TIMEOUT", default=10))
+
 BRAINTREE_CONF = Configuration(
                                 Environment.Sandbox,
                                 BRAINTREE_MERCHANT_ID,
                                 BRAINTREE_PUBLIC_KEY,
-                                BRAINTREE_PRIVATE_KEY
+                                BRAINTREE_PRIVATE_KEY,
+                                timeout=BRAINTREE_TIMEOUT,
+                                wrap_http_exceptions=True
                               ) 
 
+BRAINTREE_GATEWAY = 'payment.gateway.braintree_gateway'
+BRAINTREE_CLIENT_TOKEN_POOL_SIZE = 5
+BRAINTREE_CLIENT_TOKEN_TTL = 30 * 60
+BRAINTREE_BREAKER_FAILURES = 5
+BRAINTREE_BREAKER_RESET_TIMEOUT = 30
+
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGIN_URL = 'customer_login'
 LOGOUT_REDIRECT_URL = 'home'
 
 CART_SESSION_ID = 'cart'
+CART_STORAGE = os.environ.get("CART_STORAGE", default='cart.storage.SessionCartStorage')
+CART_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+CART_API_MAX_OPERATIONS = 100
+
+PRODUCTS_PER_PAGE = 12
+ORDERS_PER_PAGE = 20
+BULK_ORDER_LIMIT = 2000
+BULK_ORDER_BATCH_SIZE = 500
+SALES_REPORT_DAYS = 30
+SALES_REPORT_TOP_PRODUCTS = 20
+ORDER_ARCHIVE_BATCH_SIZE = 500
+ORDER_ARCHIVE_ABANDONED_DAYS = 30
+ORDER_HISTORY_PER_PAGE = 20
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BACKOFF = 60
+OUTBOX_MAX_BACKOFF = 3600
+OUTBOX_CLAIM_TIMEOUT = 5 * 60
+
+CATALOG_CACHE_TIMEOUT = 60 * 60
+COUPON_CACHE_TIMEOUT = 5 * 60
 
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
@@ -121,6 +156,17 @@ DATABASES = {
     }
 }
 
+# Cache shared by every worker: role versions, catalog versions, coupons and
+# cache-backed carts are invalidated through it, so it must not be per-process.
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache"),
+        'LOCATION': os.environ.get("CACHE_LOCATION", default="workshop_cache"),
+    }
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': (
         'rest_framework.parsers.JSONParser',
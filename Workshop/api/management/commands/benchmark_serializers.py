@@ -0,0 +1,68 @@
+import time
+from typing import Callable, Tuple
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from shop.models import Category, Product
+from ...serializers import ProductSerializer, get_projection
+
+BENCHMARK_CATEGORY = 'BenchmarkCategory'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare ProductSerializer against the values() projection on generated catalogs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows',
+                            type=int,
+                            nargs='+',
+                            default=[10000, 100000],
+                            help="Catalog sizes to benchmark")
+        parser.add_argument('--repeat',
+                            type=int,
+                            default=3,
+                            help="Runs per path, the best one is reported")
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    self.benchmark(rows, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def benchmark(self, rows: int, repeat: int) -> None:
+        category = Category.objects.create(name=BENCHMARK_CATEGORY)
+        Product.objects.bulk_create([Product(name=f"Benchmark{index}",
+                                             description=f"Benchmark product {index}",
+                                             category=category,
+                                             price=index / 100)
+                                     for index in range(rows)],
+                                    batch_size=2000)
+        queryset = Product.objects.filter(category=category).order_by('name', 'id')
+        projection = get_projection(ProductSerializer)
+        renderer = JSONRenderer()
+
+        serializer_time, serializer_body = self.measure(
+            repeat, lambda: renderer.render(ProductSerializer(queryset.all(), many=True).data))
+        projection_time, projection_body = self.measure(
+            repeat, lambda: renderer.render(projection.project_many(projection.values(queryset))))
+        if serializer_body != projection_body:
+            raise CommandError(f"Projection output differs from ProductSerializer for {rows} rows")
+        self.stdout.write(f"{rows} rows: serializer {serializer_time:.3f}s, "
+                          f"projection {projection_time:.3f}s "
+                          f"({serializer_time / projection_time:.1f}x)")
+
+    def measure(self, repeat: int, render: Callable[[], bytes]) -> Tuple[float, bytes]:
+        best, body = None, b''
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = render()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body
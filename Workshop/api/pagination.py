@@ -0,0 +1,7 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ProductCursorPagination(CursorPagination):
+    ordering = ('name', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -1,8 +1,13 @@
-from typing import Dict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.db.models import QuerySet
+from cart.cart import ADD, REMOVE, UPDATE
+from cart.forms import MAX_PRODUCT_QUANTITY
 from customer.models import Customer
-from order.models import OrderInformation
+from order.models import OrderInformation, ShopSales
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from shop.models import Employee, Product
@@ -48,15 +53,25 @@ class RegisterCustomerSerializer(serializers.ModelSerializer):
 
 
 class EmployeeSerializer(serializers.ModelSerializer):
-    employee = serializers.RelatedField(read_only=True)
-    shop = serializers.RelatedField(read_only=True)
+    employee = serializers.PrimaryKeyRelatedField(read_only=True)
+    shop = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Employee
         fields = ('employee', 'shop')
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin(object):
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ('name', 'price',
@@ -69,3 +84,106 @@ class OrderInformationSerializer(serializers.ModelSerializer):
         fields = ('name', 'surname',
                   'email', 'address',
                   'city', 'zipcode')
+
+
+class OrderLineSerializer(serializers.Serializer):
+    product = serializers.CharField(max_length=50)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class BulkOrderSerializer(OrderInformationSerializer):
+    lines = OrderLineSerializer(many=True,
+                                allow_empty=False)
+
+    class Meta(OrderInformationSerializer.Meta):
+        fields = OrderInformationSerializer.Meta.fields + ('lines',)
+
+
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=(ADD, UPDATE, REMOVE))
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0,
+                                        max_value=MAX_PRODUCT_QUANTITY,
+                                        required=False)
+
+    def validate(self, attrs: Dict):
+        if attrs['op'] == REMOVE:
+            return attrs
+        if 'quantity' not in attrs:
+            raise serializers.ValidationError({"quantity": "This field is required."})
+        if attrs['op'] == ADD and not attrs['quantity']:
+            raise serializers.ValidationError({"quantity": "Ensure this value is greater than or equal to 1."})
+        return attrs
+
+
+class CartOperationsSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True,
+                                         allow_empty=False)
+
+    def validate_operations(self, value: List[Dict]):
+        if len(value) > settings.CART_API_MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"At most {settings.CART_API_MAX_OPERATIONS} operations can be sent at once")
+        return value
+
+
+class ShopSalesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShopSales
+        fields = ('day', 'orders',
+                  'quantity', 'revenue',
+                  'paid_orders', 'paid_quantity',
+                  'paid_revenue')
+
+
+class ProductSalesSerializer(serializers.Serializer):
+    product = serializers.IntegerField(source='product_id')
+    name = serializers.CharField(source='product__name')
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    paid_quantity = serializers.IntegerField()
+    paid_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class ValuesProjection(object):
+
+    def __init__(self, serializer: serializers.ModelSerializer):
+        model = serializer.Meta.model
+        self.columns: List[Tuple[str, str, Optional[Callable]]] = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                column = model._meta.get_field(field.source).attname
+                convert = None
+            else:
+                column = '__'.join(field.source_attrs)
+                convert = field_converter(field)
+            self.columns.append((name, column, convert))
+
+    def values(self, queryset: QuerySet, *extra: str) -> QuerySet:
+        columns = [column for _, column, _ in self.columns]
+        return queryset.values(*columns, *(column for column in extra if column not in columns))
+
+    def project(self, row: Dict) -> Dict:
+        return {name: row[column] if convert is None or row[column] is None else convert(row[column])
+                for name, column, convert in self.columns}
+
+    def project_many(self, rows: Iterable[Dict]) -> List[Dict]:
+        return [self.project(row) for row in rows]
+
+
+def field_converter(field: serializers.Field) -> Optional[Callable]:
+    if type(field) is serializers.CharField:
+        return str
+    if type(field) is serializers.FloatField:
+        return float
+    return field.to_representation
+
+
+@lru_cache(maxsize=128)
+def get_projection(serializer_class: Type[serializers.ModelSerializer],
+                   fields: Optional[Tuple[str, ...]] = None) -> ValuesProjection:
+    if fields:
+        return ValuesProjection(serializer_class(fields=fields))
+    return ValuesProjection(serializer_class())
@@ -4,7 +4,8 @@ from django.db import transaction
 from django.test import TestCase
 from customer.models import Customer
 from shop.models import Assortment, Category, Employee, Magazine, Producent, Product, Shop
-from ..serializers import EmployeeSerializer, OrderInformationSerializer, ProductSerializer, RegisterCustomerSerializer
+from rest_framework.renderers import JSONRenderer
+from ..serializers import EmployeeSerializer, OrderInformationSerializer, ProductSerializer, RegisterCustomerSerializer, get_projection
 
 
 class RegisterCustomerSerializerTest(TestCase):
@@ -287,3 +288,45 @@ class OrderInformationSerializerTest(TestCase):
                 self.assertFalse(serializer.is_valid())
                 self.assertEqual(set(serializer.errors.keys()),
                                  set([error_field]))
+
+
+class ValuesProjectionTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        for index in range(3):
+            Product.objects.create(name=f"Product{index}",
+                                   description=f"Description {index}",
+                                   category=self.category,
+                                   price=20 + index / 3)
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.employee = Employee.objects.create(employee=self.user,
+                                                shop=self.shop)
+        self.renderer = JSONRenderer()
+
+    def test_product_output_matches_serializer(self):
+        products = Product.objects.order_by('name')
+        projection = get_projection(ProductSerializer)
+        self.assertEqual(self.renderer.render(projection.project_many(projection.values(products))),
+                         self.renderer.render(ProductSerializer(products, many=True).data))
+
+    def test_sparse_product_output_matches_serializer(self):
+        products = Product.objects.order_by('name')
+        projection = get_projection(ProductSerializer, ('price', 'category'))
+        self.assertEqual(self.renderer.render(projection.project_many(projection.values(products, 'id'))),
+                         self.renderer.render(ProductSerializer(products, many=True,
+                                                                fields=('price', 'category')).data))
+
+    def test_employee_output_matches_serializer(self):
+        projection = get_projection(EmployeeSerializer)
+        self.assertEqual(projection.project_many(projection.values(Employee.objects.all())),
+                         EmployeeSerializer(Employee.objects.all(), many=True).data)
+        self.assertEqual(projection.project_many(projection.values(Employee.objects.all())),
+                         [{'employee': self.user.pk, 'shop': self.shop.pk}])
@@ -1,11 +1,15 @@
+import json
+from decimal import Decimal
 from http import HTTPStatus
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from customer.models import Customer
 from order.models import OrderInformation, OrderItem
 from shop.models import Assortment, Category, Employee, Magazine, Producent, Product, Shop
-from ..serializers import EmployeeSerializer, ProductSerializer
+from ..serializers import EmployeeSerializer, ProductSerializer, get_projection
 
 
 class ProductTest(TestCase):
@@ -45,6 +49,74 @@ class ProductTest(TestCase):
         response = self.client.get(f'/api/product/{20}', format='json')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
 
+    def test_product_detail_not_modified(self):
+        response = self.client.get(f'/api/product/{self.product.id}', HTTP_ACCEPT='application/json')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/product/{self.product.id}',
+                                       HTTP_ACCEPT='application/json',
+                                       HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_product_list_etag_follows_catalog(self):
+        response = self.client.get('/api/product/list', HTTP_ACCEPT='application/json')
+        etag = response['ETag']
+        response = self.client.get('/api/product/list',
+                                   HTTP_ACCEPT='application/json',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.product.price = 30
+        self.product.save()
+        response = self.client.get('/api/product/list',
+                                   HTTP_ACCEPT='application/json',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class ProductListTest(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="TestCategory")
+        for index in range(5):
+            Product.objects.create(name=f"Product{index}",
+                                   description="Example",
+                                   category=self.category,
+                                   price=20 + index)
+
+    def test_cursor_pagination(self):
+        response = self.client.get('/api/product/list', {'page_size': 2},
+                                   HTTP_ACCEPT='application/json')
+        data = response.json()
+        self.assertEqual([product['name'] for product in data['results']],
+                         ["Product0", "Product1"])
+        self.assertIsNone(data['previous'])
+        response = self.client.get(data['next'], HTTP_ACCEPT='application/json')
+        self.assertEqual([product['name'] for product in response.json()['results']],
+                         ["Product2", "Product3"])
+
+    def test_sparse_fieldset(self):
+        response = self.client.get('/api/product/list', {'fields': 'name,price,unknown'},
+                                   HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['results'][0], {'name': "Product0", 'price': 20.0})
+
+    def test_field_permutations_share_a_projection(self):
+        get_projection.cache_clear()
+        for fields in ('name,price', 'price,name', 'price,name,name,unknown'):
+            response = self.client.get('/api/product/list', {'fields': fields},
+                                       HTTP_ACCEPT='application/json')
+            self.assertEqual(response.json()['results'][0], {'name': "Product0", 'price': 20.0})
+        self.assertEqual(get_projection.cache_info().currsize, 1)
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/api/product/list', {'stream': 'ndjson', 'fields': 'name'},
+                                   HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{'name': f"Product{index}"} for index in range(5)])
+
 
 class RegisterCustomerTest(TestCase):
 
@@ -192,6 +264,21 @@ class OrderInformationTest(TestCase):
         self.assertEqual(1, OrderInformation.objects.count())
         self.assertEqual(1, OrderItem.objects.count())
 
+    def test_order_routed_to_stocked_shop(self):
+        magazine = Magazine.objects.create(address="SecondMagazine")
+        magazine.assortment.add(Assortment.objects.create(product=self.product,
+                                                          quantity=50,
+                                                          category=self.category))
+        shop = Shop.objects.create(name="SecondShop",
+                                   address="SecondAdress")
+        shop.magazine.add(magazine)
+        self.assortment.quantity = 0
+        self.assortment.save()
+        response = self.client.post(
+            f'/api/order/create/{self.product.name}', data=self.data)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(OrderItem.objects.get().shop, shop)
+
     def test_invalid_email(self):
         self.data['email'] = "OrderInvalidEmail"
         response = self.client.post(
@@ -239,3 +326,167 @@ class OrderInformationTest(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
         self.assertNotEqual(1, OrderInformation.objects.count())
         self.assertNotEqual(1, OrderItem.objects.count())
+
+
+class OrderBulkCreateTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.magazine = Magazine.objects.create(address="SimpleMagazine")
+        self.shop.magazine.add(self.magazine)
+        self.products = []
+        for index in range(3):
+            product = Product.objects.create(name=f"Product{index}",
+                                             description="Example",
+                                             category=self.category,
+                                             price=20)
+            self.magazine.assortment.add(Assortment.objects.create(product=product,
+                                                                   quantity=100,
+                                                                   category=self.category))
+            self.products.append(product)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+
+    def order(self, *lines, **fields):
+        order = {"name": "TestName",
+                 "surname": "TestSurname",
+                 "email": "TestEmail@example.com",
+                 "address": "TestAddress",
+                 "city": "TestCity",
+                 "zipcode": "33-333",
+                 "lines": [{"product": product, "quantity": quantity} for product, quantity in lines]}
+        order.update(fields)
+        return order
+
+    def post(self, orders):
+        return self.client.post('/api/order/bulk', data=json.dumps(orders),
+                                content_type='application/json')
+
+    def test_orders_are_created(self):
+        response = self.post([self.order(("Product0", 2), ("Product1", 1), ("Product0", 3)),
+                              self.order(("Product2", 4))])
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'created'])
+        self.assertEqual(OrderInformation.objects.count(), 2)
+        first = OrderInformation.objects.get(pk=results[0]['id'])
+        self.assertEqual(sorted(OrderItem.objects.filter(order_information=first)
+                                                 .values_list('product__name', 'quantity', 'shop')),
+                         [("Product0", 5, self.shop.id), ("Product1", 1, self.shop.id)])
+        self.assertEqual(first.total, Decimal('120.00'))
+
+    def test_per_order_results(self):
+        response = self.post([self.order(("Product0", 1)),
+                              self.order(("Product0", 1), email="invalid"),
+                              self.order(("Missing", 1)),
+                              self.order()])
+        self.assertEqual(response.status_code, HTTPStatus.MULTI_STATUS)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results],
+                         ['created', 'invalid', 'invalid', 'invalid'])
+        self.assertIn('email', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'lines': ["Product Missing does not exist"]})
+        self.assertIn('lines', results[3]['errors'])
+        self.assertEqual(OrderInformation.objects.count(), 1)
+
+    def test_rejects_everything_invalid(self):
+        response = self.post([self.order(("Missing", 1))])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(OrderInformation.objects.exists())
+        response = self.post({"orders": []})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_routed_orders_draw_down_stock(self):
+        Assortment.objects.filter(product=self.products[0]).update(quantity=3)
+        other_shop = Shop.objects.create(name="OtherShop",
+                                         address="OtherAdress")
+        magazine = Magazine.objects.create(address="OtherMagazine")
+        magazine.assortment.add(Assortment.objects.create(product=self.products[0],
+                                                          quantity=100,
+                                                          category=self.category))
+        other_shop.magazine.add(magazine)
+        response = self.post([self.order(("Product0", 2)), self.order(("Product0", 2))])
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(list(OrderItem.objects.order_by('order_information')
+                                               .values_list('shop', flat=True)),
+                         [self.shop.id, other_shop.id])
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.post([self.order(("Product0", 1))])
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+
+class CartLinesTest(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="TestCategory")
+        self.products = [Product.objects.create(name=f"Product{index}",
+                                                description="Example",
+                                                category=self.category,
+                                                price=20)
+                         for index in range(3)]
+
+    def post(self, *operations):
+        return self.client.post('/api/cart', data=json.dumps({"operations": list(operations)}),
+                                content_type='application/json')
+
+    def test_operations_are_applied_in_order(self):
+        first, second, third = self.products
+        self.post({"op": "add", "product": first.id, "quantity": 1},
+                  {"op": "add", "product": third.id, "quantity": 1})
+        response = self.post({"op": "add", "product": first.id, "quantity": 2},
+                             {"op": "update", "product": second.id, "quantity": 4},
+                             {"op": "remove", "product": third.id})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()
+        self.assertEqual([(line['product'], line['quantity']) for line in data['lines']],
+                         [(first.id, 3), (second.id, 4)])
+        self.assertEqual(data['count'], 7)
+        self.assertEqual(Decimal(data['total_price']), Decimal('140'))
+        self.assertEqual(self.client.get('/api/cart').json(), data)
+
+    def test_update_to_zero_removes_line(self):
+        product = self.products[0]
+        self.post({"op": "add", "product": product.id, "quantity": 2})
+        response = self.post({"op": "update", "product": product.id, "quantity": 0})
+        self.assertEqual(response.json()['lines'], [])
+
+    def test_unknown_product_rejects_whole_batch(self):
+        product = self.products[0]
+        response = self.post({"op": "add", "product": product.id, "quantity": 1},
+                             {"op": "add", "product": 0, "quantity": 1})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(response.json(), {'operations': ["Product 0 does not exist"]})
+        self.assertEqual(self.client.get('/api/cart').json()['lines'], [])
+
+    def test_invalid_operations(self):
+        response = self.post({"op": "add", "product": self.products[0].id})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.post()
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_quantity_is_capped(self):
+        product = self.products[0]
+        response = self.post({"op": "update", "product": product.id, "quantity": 21})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.post({"op": "add", "product": product.id, "quantity": 15},
+                             {"op": "add", "product": product.id, "quantity": 15})
+        self.assertEqual(response.json()['lines'][0]['quantity'], 20)
+
+    def test_products_are_loaded_once(self):
+        self.post({"op": "add", "product": self.products[0].id, "quantity": 1})
+        with CaptureQueriesContext(connection) as small:
+            self.post({"op": "add", "product": self.products[1].id, "quantity": 1})
+        with CaptureQueriesContext(connection) as large:
+            self.post(*({"op": "update", "product": product.id, "quantity": 2} for product in self.products))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len([query for query in large.captured_queries
+                              if 'shop_product' in query['sql'] and query['sql'].startswith('SELECT')]), 1)
@@ -18,6 +18,15 @@ urlpatterns = [
     path('employee/<int:pk>',
          views.EmployeeDetail.as_view(),
          name="api_employee_detail"),
+    path('order/bulk',
+         views.OrderBulkCreate.as_view(),
+         name="api_order_bulk"),
+    path('cart',
+         views.CartLines.as_view(),
+         name="api_cart"),
+    path('report/sales',
+         views.SalesReport.as_view(),
+         name="api_sales_report"),
     path('order/create/<str:product>',
          views.OrderListOrCreate.as_view(),
          name="api_order_create")
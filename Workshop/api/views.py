@@ -1,35 +1,87 @@
-from typing import Dict
+import json
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from cart.cart import REMOVE, Cart, get_cart
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from order.models import OrderInformation, OrderItem
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from order.forms import SalesReportForm
+from order.models import OrderInformation, OrderItem, unit_price
+from order.rollups import record_orders, sales_report
+from order.totals import store_order_totals
 from rest_framework import generics, status
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
-from shop.models import Employee, Product, Shop
-from .serializers import EmployeeSerializer, OrderInformationSerializer, ProductSerializer, RegisterCustomerSerializer
+from shop.conditional import api_catalog_etag, api_product_etag, api_product_last_modified
+from shop.middleware import resolve_role
+from shop.models import Employee, Product
+from shop.routing import Routing, load_stock, reserve_stock, route_basket
+from .pagination import ProductCursorPagination
+from .serializers import BulkOrderSerializer, CartOperationsSerializer, EmployeeSerializer, OrderInformationSerializer, ProductSalesSerializer, \
+    ProductSerializer, RegisterCustomerSerializer, ShopSalesSerializer, get_projection
 
+STREAM_CHUNK_SIZE = 2000
 
-class ProductList(APIView):
 
+class ProductList(generics.ListAPIView):
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+
+    def get_fields(self) -> Optional[Tuple[str, ...]]:
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+        requested = set(fields.split(','))
+        return tuple(field for field in ProductSerializer.Meta.fields
+                     if field in requested)
+
+    def get_projected_queryset(self):
+        projection = get_projection(ProductSerializer, self.get_fields())
+        queryset = self.filter_queryset(self.get_queryset())
+        return projection, projection.values(queryset, *self.pagination_class.ordering)
+
+    @method_decorator(condition(etag_func=api_catalog_etag))
     def get(self,
             request: WSGIRequest,
             format=None):
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        if request.query_params.get('stream') == 'ndjson':
+            return self.stream(request)
+        return self.list(request)
+
+    def list(self, request: WSGIRequest, *args, **kwargs) -> Response:
+        projection, queryset = self.get_projected_queryset()
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(projection.project_many(page))
+
+    def stream(self, request: WSGIRequest) -> StreamingHttpResponse:
+        projection, queryset = self.get_projected_queryset()
+        queryset = queryset.order_by(*self.pagination_class.ordering)
+        rows = (json.dumps(projection.project(product), cls=JSONEncoder) + '\n'
+                for product in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE))
+        return StreamingHttpResponse(rows, content_type='application/x-ndjson')
 
 
 class ProductDetail(APIView):
 
+    @method_decorator(condition(etag_func=api_product_etag,
+                                last_modified_func=api_product_last_modified))
     def get(self,
             request: WSGIRequest,
             pk: int,
             format=None):
-        product = get_object_or_404(Product, id=pk)
-        serializer = ProductSerializer(product)
-        return Response(serializer.data)
+        projection = get_projection(ProductSerializer)
+        product = get_object_or_404(projection.values(Product.objects.all()), id=pk)
+        return Response(projection.project(product))
 
 
 class RegisterCustomer(generics.CreateAPIView):
@@ -43,9 +95,9 @@ class EmployeeList(APIView):
     def get(self,
             request: WSGIRequest,
             format=None):
-        employees = Employee.objects.all()
-        serializer = EmployeeSerializer(employees, many=True)
-        return Response(serializer.data)
+        projection = get_projection(EmployeeSerializer)
+        employees = projection.values(Employee.objects.all())
+        return Response(projection.project_many(employees))
 
 
 class EmployeeDetail(APIView):
@@ -74,20 +126,175 @@ class OrderListOrCreate(APIView):
              product: str,
              format=None):
         serializer = OrderInformationSerializer(data=request.data)
-        product = Product.objects.get(name=product)
-        shop = Shop.objects.get(magazine__assortment__product=product)
+        product = get_object_or_404(Product, name=product)
+        routing = route_basket({product.id: 1})
+        if not routing.is_routable:
+            return Response("Product is not available in any shop", status=status.HTTP_400_BAD_REQUEST)
         if serializer.is_valid():
             data: Dict = serializer.data
-            order_information = OrderInformation.objects.create(name=data['name'],
-                                                                surname=data['surname'],
-                                                                email=data['email'],
-                                                                address=data['address'],
-                                                                city=data['city'],
-                                                                zipcode=data['zipcode'])
-            OrderItem.objects.create(product=product,
-                                     quantity=1,
-                                     order_information=order_information,
-                                     shop=shop)
+            with transaction.atomic():
+                order_information = OrderInformation.objects.create(name=data['name'],
+                                                                    surname=data['surname'],
+                                                                    email=data['email'],
+                                                                    address=data['address'],
+                                                                    city=data['city'],
+                                                                    zipcode=data['zipcode'])
+                OrderItem.objects.create(product=product,
+                                         quantity=1,
+                                         price=unit_price(product.price),
+                                         order_information=order_information,
+                                         shop_id=routing.shop_for(product.id))
+                store_order_totals([order_information.pk])
+                record_orders([order_information.pk])
 
             return Response("Order have been successfully created", status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class OrderBulkCreate(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self,
+             request: WSGIRequest,
+             format=None):
+        if not isinstance(request.data, list):
+            return Response("Expected a list of orders", status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > settings.BULK_ORDER_LIMIT:
+            return Response(f"At most {settings.BULK_ORDER_LIMIT} orders can be sent at once",
+                            status=status.HTTP_400_BAD_REQUEST)
+        results: List[Optional[Dict]] = [None] * len(request.data)
+        accepted: List[Tuple[int, Dict]] = []
+        serializer = BulkOrderSerializer()
+        for index, data in enumerate(request.data):
+            try:
+                accepted.append((index, serializer.run_validation(data)))
+            except ValidationError as error:
+                results[index] = self.rejected(index, error.detail)
+
+        names = {line['product'] for _, order in accepted for line in order['lines']}
+        products = {name: (product, price) for name, product, price
+                    in Product.objects.filter(name__in=names).values_list('name', 'id', 'price')}
+        stock = load_stock(product for product, _ in products.values())
+        routed: List[Tuple[int, Dict, Dict[int, int], Routing]] = []
+        for index, order in accepted:
+            unknown = sorted({line['product'] for line in order['lines']} - set(products))
+            if unknown:
+                results[index] = self.rejected(index, {'lines': [f"Product {name} does not exist"
+                                                                 for name in unknown]})
+                continue
+            lines: Dict[int, int] = defaultdict(int)
+            for line in order['lines']:
+                lines[products[line['product']][0]] += line['quantity']
+            routing = route_basket(lines, stock)
+            if not routing.is_routable:
+                results[index] = self.rejected(index, {'lines': ["Some of the products are not available in any shop"]})
+                continue
+            reserve_stock(stock, lines, routing)
+            routed.append((index, order, lines, routing))
+
+        prices = {product: unit_price(price) for product, price in products.values()}
+        for index, order_information in self.create(routed, prices):
+            results[index] = {'index': index,
+                              'status': 'created',
+                              'id': order_information.pk}
+        if not routed:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif len(routed) < len(results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({'results': results}, status=response_status)
+
+    def rejected(self, index: int, errors) -> Dict:
+        return {'index': index,
+                'status': 'invalid',
+                'errors': errors}
+
+    def create(self,
+               routed: List[Tuple[int, Dict, Dict[int, int], Routing]],
+               prices: Dict[int, Decimal]) -> List[Tuple[int, OrderInformation]]:
+        order_informations = [OrderInformation(**{field: value for field, value in order.items()
+                                                  if field != 'lines'})
+                              for _, order, _, _ in routed]
+        with transaction.atomic():
+            if connections[OrderInformation.objects.db].features.can_return_rows_from_bulk_insert:
+                OrderInformation.objects.bulk_create(order_informations,
+                                                     batch_size=settings.BULK_ORDER_BATCH_SIZE)
+            else:
+                for order_information in order_informations:
+                    order_information.save()
+            OrderItem.objects.bulk_create([OrderItem(order_information=order_information,
+                                                     product_id=product,
+                                                     quantity=quantity,
+                                                     price=prices[product],
+                                                     shop_id=routing.shop_for(product))
+                                           for order_information, (_, _, lines, routing)
+                                           in zip(order_informations, routed)
+                                           for product, quantity in lines.items()],
+                                          batch_size=settings.BULK_ORDER_BATCH_SIZE)
+            store_order_totals(order_information.pk for order_information in order_informations)
+            record_orders(order_information.pk for order_information in order_informations)
+        return [(index, order_information)
+                for (index, _, _, _), order_information in zip(routed, order_informations)]
+
+
+class CartLines(APIView):
+    permission_classes = (AllowAny,)
+
+    def get(self,
+            request: WSGIRequest,
+            format=None):
+        return Response(self.cart_data(get_cart(request)))
+
+    def post(self,
+             request: WSGIRequest,
+             format=None):
+        serializer = CartOperationsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations: List[Dict] = serializer.validated_data['operations']
+        cart = get_cart(request)
+        products = Product.objects.in_bulk(set(cart.product_ids) |
+                                           {operation['product'] for operation in operations})
+        unknown = sorted({operation['product'] for operation in operations
+                          if operation['op'] != REMOVE} - set(products))
+        if unknown:
+            return Response({'operations': [f"Product {product} does not exist" for product in unknown]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            cart.apply(operations, products)
+        return Response(self.cart_data(cart))
+
+    def cart_data(self, cart: Cart) -> Dict:
+        coupon = cart.coupon
+        return {'lines': [{'product': line['product'].id,
+                           'name': line['product'].name,
+                           'quantity': line['quantity'],
+                           'price': line['price'],
+                           'total_price': line['total_price']}
+                          for line in cart],
+                'count': len(cart),
+                'total_price': cart.get_total_price(),
+                'discount': cart.get_discount(),
+                'total_price_after_discount': cart.get_total_price_after_discount(),
+                'coupon': coupon.code if coupon else None}
+
+
+class SalesReport(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self,
+            request: WSGIRequest,
+            format=None):
+        role = resolve_role(request.user)
+        if not role.is_owner:
+            return Response("Sales report is available to shop owners only", status=status.HTTP_403_FORBIDDEN)
+        report_form = SalesReportForm(request.query_params)
+        if not report_form.is_valid():
+            return Response(report_form.errors, status=status.HTTP_400_BAD_REQUEST)
+        cd: Dict = report_form.cleaned_data
+        report = sales_report(role.shop_id, cd['start'], cd['end'])
+        return Response({'start': report.start,
+                         'end': report.end,
+                         'totals': report.totals,
+                         'days': ShopSalesSerializer(report.days, many=True).data,
+                         'products': ProductSalesSerializer(report.products, many=True).data})
@@ -1,3 +1,7 @@
 from django.contrib import admin
+from .models import CartLine
 
-# Register your models here.
+
+@admin.register(CartLine)
+class CartLineAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'product', 'quantity', 'price', 'updated_at')
@@ -1,30 +1,46 @@
 from decimal import Decimal
-from typing import Union
-from django.conf import settings
+from typing import Dict, Iterable, List, Optional, Union
 from django.core.handlers.wsgi import WSGIRequest
+from coupons.cache import get_coupon
 from coupons.models import Coupon
 from shop.models import Product
+from .forms import MAX_PRODUCT_QUANTITY
+from .storage import get_cart_storage
+
+
+CART_REQUEST_ATTRIBUTE = '_cart'
+UNRESOLVED = object()
+ADD = 'add'
+UPDATE = 'update'
+REMOVE = 'remove'
 
 
 class Cart(object):
 
     def __init__(self, request: WSGIRequest):
         self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
+        self.storage = get_cart_storage(request)
+        self.cart = self.storage.load()
         self.coupon_id = self.session.get('coupon_id')
+        self._coupon = UNRESOLVED
+        self.reset()
+
+    def reset(self) -> None:
+        self._lines: Optional[List[Dict]] = None
+        self._total_price: Optional[Decimal] = None
+        self._length: Optional[int] = None
 
     @property
     def coupon(self) -> Union[Coupon, None]:
-        if self.coupon_id:
-            return Coupon.objects.get(id=self.coupon_id)
-        return None
+        if self._coupon is UNRESOLVED:
+            coupon = get_coupon(self.coupon_id) if self.coupon_id else None
+            self._coupon = coupon if coupon is not None and coupon.is_valid() else None
+        return self._coupon
 
     def get_discount(self) -> Union[float, int]:
-        if self.coupon:
-            return (self.coupon.discount / Decimal('100')) * self.get_total_price()
+        coupon = self.coupon
+        if coupon:
+            return (coupon.discount / Decimal('100')) * self.get_total_price()
         return Decimal('0')
 
     def get_total_price_after_discount(self) -> float:
@@ -45,36 +61,91 @@ class Cart(object):
         else:
             self.cart[product_id]['quantity'] += quantity
 
-        self.save()
+        self.storage.save_line(self.cart, product_id)
+        self.reset()
 
     def save(self) -> None:
-        self.session[settings.CART_SESSION_ID] = self.cart
-        self.session.modified = True
+        self.storage.save(self.cart)
+        self.reset()
 
     def remove(self,
                product: Product) -> None:
         product_id = str(product.id)
         if product_id in self.cart:
             del self.cart[product_id]
-            self.save()
+            self.storage.remove_line(self.cart, product_id)
+            self.reset()
 
-    def __iter__(self):
-        product_ids = self.cart.keys()
-        products = Product.objects.filter(id__in=product_ids)
-        for product in products:
-            self.cart[str(product.id)]['product'] = product
+    @property
+    def lines(self) -> List[Dict]:
+        if self._lines is None:
+            self._lines = self.build_lines(Product.objects.in_bulk(self.product_ids))
+        return self._lines
 
-        for item in self.cart.values():
-            item['price'] = Decimal(item['price'])
-            item['total_price'] = item['price'] * item['quantity']
-            yield item
+    @property
+    def product_ids(self) -> List[int]:
+        return [int(product_id) for product_id in self.cart]
+
+    def build_lines(self, products: Dict[int, Product]) -> List[Dict]:
+        lines = []
+        for product_id, item in self.cart.items():
+            product = products.get(int(product_id))
+            if product is None:
+                continue
+            price = Decimal(item['price'])
+            lines.append({'product': product,
+                          'quantity': item['quantity'],
+                          'price': price,
+                          'total_price': price * item['quantity']})
+        return lines
+
+    def apply(self,
+              operations: Iterable[Dict],
+              products: Dict[int, Product]) -> None:
+        touched = []
+        for operation in operations:
+            product_id = str(operation['product'])
+            if product_id not in touched:
+                touched.append(product_id)
+            if operation['op'] == REMOVE or (operation['op'] == UPDATE and not operation['quantity']):
+                self.cart.pop(product_id, None)
+                continue
+            line = self.cart.setdefault(product_id, {'quantity': 0,
+                                                     'price': str(products[operation['product']].price)})
+            if operation['op'] == UPDATE:
+                line['quantity'] = operation['quantity']
+            else:
+                line['quantity'] = min(line['quantity'] + operation['quantity'], MAX_PRODUCT_QUANTITY)
+        for product_id in touched:
+            if product_id in self.cart:
+                self.storage.save_line(self.cart, product_id)
+            else:
+                self.storage.remove_line(self.cart, product_id)
+        self.reset()
+        self._lines = self.build_lines(products)
+
+    def __iter__(self):
+        return iter(self.lines)
 
     def __len__(self):
-        return sum(item['quantity'] for item in self.cart.values())
+        if self._length is None:
+            self._length = sum(line['quantity'] for line in self.lines)
+        return self._length
 
     def get_total_price(self):
-        return sum(Decimal(item['price']) * item['quantity'] for item in self.cart.values())
+        if self._total_price is None:
+            self._total_price = sum((line['total_price'] for line in self.lines), Decimal('0'))
+        return self._total_price
 
     def clear(self):
-        del self.session[settings.CART_SESSION_ID]
-        self.session.modified = True
+        self.storage.clear()
+        self.cart = {}
+        self.reset()
+
+
+def get_cart(request: WSGIRequest) -> Cart:
+    cart = getattr(request, CART_REQUEST_ATTRIBUTE, None)
+    if cart is None:
+        cart = Cart(request)
+        setattr(request, CART_REQUEST_ATTRIBUTE, cart)
+    return cart
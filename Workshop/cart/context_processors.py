@@ -1,5 +1,34 @@
-from .cart import Cart
+from django.core.handlers.wsgi import WSGIRequest
+from django.utils.functional import SimpleLazyObject
+from .cart import Cart, get_cart
+
+CART_USAGE_ATTRIBUTE = 'cart_usage'
+
+
+class CartUsage(object):
+
+    def __init__(self):
+        self.renders = 0
+        self.loads = 0
+
+    def __str__(self):
+        return f"Cart loaded in {self.loads} of {self.renders} renders"
+
+
+def get_cart_usage(request: WSGIRequest) -> CartUsage:
+    usage = getattr(request, CART_USAGE_ATTRIBUTE, None)
+    if usage is None:
+        usage = CartUsage()
+        setattr(request, CART_USAGE_ATTRIBUTE, usage)
+    return usage
 
 
 def cart(request): 
-    return {'cart': Cart(request)}
+    usage = get_cart_usage(request)
+    usage.renders += 1
+
+    def load() -> Cart:
+        usage.loads += 1
+        return get_cart(request)
+
+    return {'cart': SimpleLazyObject(load)}
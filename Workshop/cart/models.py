@@ -1,3 +1,17 @@
 from django.db import models
+from shop.models import Product
 
-# Create your models here.
+
+class CartLine(models.Model):
+    owner = models.CharField(max_length=64)
+    product = models.ForeignKey(Product,
+                                on_delete=models.CASCADE)
+    quantity = models.IntegerField()
+    price = models.CharField(max_length=20)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('owner', 'product')
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} in cart {self.owner}"
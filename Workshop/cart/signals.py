@@ -0,0 +1,15 @@
+from typing import Dict
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.core.handlers.wsgi import WSGIRequest
+from django.dispatch import receiver
+from .storage import get_cart_storage
+
+
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender: type,
+                         request: WSGIRequest,
+                         user: User,
+                         **kwargs: Dict) -> None:
+    if request is not None and hasattr(request, 'session'):
+        get_cart_storage(request).merge_anonymous(user)
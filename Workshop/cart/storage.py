@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from uuid import uuid4
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import IntegrityError, transaction
+from django.utils.module_loading import import_string
+from .forms import MAX_PRODUCT_QUANTITY
+from .models import CartLine
+
+CART_TOKEN_SESSION_ID = 'cart_token'
+CART_CACHE_KEY = 'cart:{}'
+
+
+class SessionCartStorage(object):
+
+    def __init__(self, request: WSGIRequest):
+        self.request = request
+        self.session = request.session
+
+    def load(self) -> Dict[str, Dict]:
+        return self.session.get(settings.CART_SESSION_ID) or {}
+
+    def save(self, cart: Dict[str, Dict]) -> None:
+        self.session[settings.CART_SESSION_ID] = cart
+        self.session.modified = True
+
+    def save_line(self, cart: Dict[str, Dict], product_id: str) -> None:
+        self.save(cart)
+
+    def remove_line(self, cart: Dict[str, Dict], product_id: str) -> None:
+        self.save(cart)
+
+    def clear(self) -> None:
+        self.session.pop(settings.CART_SESSION_ID, None)
+        self.session.modified = True
+
+    def merge_anonymous(self, user: User) -> None:
+        pass
+
+
+class ServerCartStorage(SessionCartStorage, ABC):
+
+    def anonymous_owner(self, create: bool = False) -> Optional[str]:
+        token = self.session.get(CART_TOKEN_SESSION_ID)
+        if token is None and create:
+            token = self.session[CART_TOKEN_SESSION_ID] = uuid4().hex
+        return f"session:{token}" if token else None
+
+    def user_owner(self, user: User) -> str:
+        return f"user:{user.pk}"
+
+    def owner(self, create: bool = False) -> Optional[str]:
+        user = getattr(self.request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return self.user_owner(user)
+        return self.anonymous_owner(create)
+
+    def load(self) -> Dict[str, Dict]:
+        owner = self.owner()
+        return self.load_owner(owner) if owner else {}
+
+    def save(self, cart: Dict[str, Dict]) -> None:
+        self.save_owner(self.owner(create=True), cart)
+
+    def clear(self) -> None:
+        owner = self.owner()
+        if owner:
+            self.clear_owner(owner)
+
+    def merge_anonymous(self, user: User) -> None:
+        anonymous = self.anonymous_owner()
+        if anonymous is None:
+            return
+        owner = self.user_owner(user)
+        lines = self.load_owner(anonymous)
+        if lines:
+            cart = self.load_owner(owner)
+            for product_id, line in lines.items():
+                if product_id in cart:
+                    cart[product_id]['quantity'] = min(cart[product_id]['quantity'] + line['quantity'],
+                                                       MAX_PRODUCT_QUANTITY)
+                else:
+                    cart[product_id] = line
+            self.save_owner(owner, cart)
+            self.clear_owner(anonymous)
+        self.session.pop(CART_TOKEN_SESSION_ID, None)
+
+    @abstractmethod
+    def load_owner(self, owner: str) -> Dict[str, Dict]:
+        pass
+
+    @abstractmethod
+    def save_owner(self, owner: str, cart: Dict[str, Dict]) -> None:
+        pass
+
+    @abstractmethod
+    def clear_owner(self, owner: str) -> None:
+        pass
+
+
+class CacheCartStorage(ServerCartStorage):
+
+    def load_owner(self, owner: str) -> Dict[str, Dict]:
+        return cache.get(CART_CACHE_KEY.format(owner)) or {}
+
+    def save_owner(self, owner: str, cart: Dict[str, Dict]) -> None:
+        cache.set(CART_CACHE_KEY.format(owner), cart, timeout=settings.CART_CACHE_TIMEOUT)
+
+    def clear_owner(self, owner: str) -> None:
+        cache.delete(CART_CACHE_KEY.format(owner))
+
+
+class DatabaseCartStorage(ServerCartStorage):
+
+    def load_owner(self, owner: str) -> Dict[str, Dict]:
+        return {str(product_id): {'quantity': quantity, 'price': price}
+                for product_id, quantity, price in CartLine.objects.filter(owner=owner)
+                                                                   .order_by('id')
+                                                                   .values_list('product_id', 'quantity', 'price')}
+
+    def upsert(self, owner: str, product_id: str, line: Dict) -> None:
+        updated = CartLine.objects.filter(owner=owner, product_id=product_id) \
+                                  .update(quantity=line['quantity'], price=line['price'])
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                CartLine.objects.create(owner=owner,
+                                        product_id=product_id,
+                                        quantity=line['quantity'],
+                                        price=line['price'])
+        except IntegrityError:
+            CartLine.objects.filter(owner=owner, product_id=product_id) \
+                            .update(quantity=line['quantity'], price=line['price'])
+
+    def save_owner(self, owner: str, cart: Dict[str, Dict]) -> None:
+        with transaction.atomic():
+            CartLine.objects.filter(owner=owner).exclude(product_id__in=list(cart)).delete()
+            for product_id, line in cart.items():
+                self.upsert(owner, product_id, line)
+
+    def save_line(self, cart: Dict[str, Dict], product_id: str) -> None:
+        self.upsert(self.owner(create=True), product_id, cart[product_id])
+
+    def remove_line(self, cart: Dict[str, Dict], product_id: str) -> None:
+        owner = self.owner()
+        if owner:
+            CartLine.objects.filter(owner=owner, product_id=product_id).delete()
+
+    def clear_owner(self, owner: str) -> None:
+        CartLine.objects.filter(owner=owner).delete()
+
+
+def get_cart_storage(request: WSGIRequest) -> SessionCartStorage:
+    return import_string(settings.CART_STORAGE)(request)
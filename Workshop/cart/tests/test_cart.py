@@ -1 +1,141 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from coupons.models import Coupon
+from shop.models import Category, Product
+from ..cart import Cart, get_cart
+
+
+class CartTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.products = [Product.objects.create(name=f"Product{index}",
+                                                description="Example",
+                                                category=self.category,
+                                                price=10 + index)
+                         for index in range(3)]
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+
+    def fill_cart(self):
+        session = self.client.session
+        session[settings.CART_SESSION_ID] = {str(product.id): {'quantity': 2, 'price': str(product.price)}
+                                             for product in self.products}
+        session.save()
+
+    def request(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        return request
+
+    def test_cart_is_shared_within_request(self):
+        request = self.request()
+        self.assertIs(get_cart(request), get_cart(request))
+
+    def test_products_are_loaded_once(self):
+        self.fill_cart()
+        cart = Cart(self.request())
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(cart)), 3)
+            self.assertEqual(len(list(cart)), 3)
+            self.assertEqual(cart.get_total_price(), Decimal('66'))
+            self.assertEqual(len(cart), 6)
+
+    def test_missing_products_are_left_out_of_totals(self):
+        self.fill_cart()
+        self.products[2].delete()
+        cart = Cart(self.request())
+        self.assertEqual(len(list(cart)), 2)
+        self.assertEqual(len(cart), 4)
+        self.assertEqual(cart.get_total_price(), Decimal('42'))
+
+    def test_session_keeps_plain_values(self):
+        self.fill_cart()
+        request = self.request()
+        cart = Cart(request)
+        list(cart)
+        for item in request.session[settings.CART_SESSION_ID].values():
+            self.assertEqual(set(item), {'quantity', 'price'})
+
+    def test_totals_are_recomputed_after_mutation(self):
+        cart = Cart(self.request())
+        self.assertEqual(cart.get_total_price(), 0)
+        cart.add(self.products[0], 3)
+        self.assertEqual(cart.get_total_price(), Decimal('30'))
+        self.assertEqual([item['quantity'] for item in cart], [3])
+        cart.remove(self.products[0])
+        self.assertEqual(len(cart), 0)
+        self.assertEqual(list(cart), [])
+
+    def test_cart_page_loads_products_once(self):
+        self.fill_cart()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('cart_detail'))
+        self.assertContains(response, "Product2")
+        product_queries = [query for query in context.captured_queries
+                           if 'FROM "shop_product"' in query['sql']]
+        self.assertEqual(len(product_queries), 1)
+        self.assertIsNotNone(response.context['cart'].lines[0]['update_quantity_form'])
+
+
+class CartCouponTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.coupon = Coupon.objects.create(code="TestCode",
+                                            valid_from=now - timedelta(days=1),
+                                            valid_to=now + timedelta(days=1),
+                                            discount=10,
+                                            active=True)
+        self.category = Category.objects.create(name="TestCategory")
+        self.product = Product.objects.create(name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=50)
+
+    def cart(self):
+        request = RequestFactory().get('/')
+        request.session = SessionStore()
+        request.session['coupon_id'] = self.coupon.id
+        cart = Cart(request)
+        cart.add(self.product, 2)
+        return cart
+
+    def test_coupon_is_resolved_once(self):
+        self.cart().coupon
+        cart = self.cart()
+        list(cart)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(cart.get_discount(), Decimal('10'))
+            self.assertEqual(cart.get_total_price_after_discount(), Decimal('90'))
+            self.assertEqual(cart.coupon.code, "TestCode")
+        self.assertLessEqual(len(context), 1)
+        self.assertFalse([query for query in context.captured_queries if 'coupons_coupon' in query['sql']])
+
+    def test_saving_coupon_invalidates_cache(self):
+        self.cart().coupon
+        self.coupon.discount = 50
+        self.coupon.save()
+        self.assertEqual(self.cart().get_discount(), Decimal('50'))
+
+    def test_expired_coupon_is_ignored(self):
+        self.cart().coupon
+        self.coupon.valid_to = timezone.now() - timedelta(minutes=1)
+        self.coupon.save()
+        self.assertIsNone(self.cart().coupon)
+        self.assertEqual(self.cart().get_discount(), Decimal('0'))
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from django.contrib.auth import login
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from shop.models import Category, Product
+from ..cart import Cart
+from ..forms import MAX_PRODUCT_QUANTITY
+from ..models import CartLine
+from ..storage import ServerCartStorage
+
+
+class CartStorageMixin(object):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.hammer = Product.objects.create(name="Hammer",
+                                             description="Example",
+                                             category=self.category,
+                                             price=20)
+        self.saw = Product.objects.create(name="Saw",
+                                          description="Example",
+                                          category=self.category,
+                                          price=5)
+        self.session = SessionStore()
+
+    def request(self, user=None):
+        request = RequestFactory().get('/')
+        request.session = self.session
+        request.user = user or AnonymousUser()
+        return request
+
+    def quantities(self, cart):
+        return {item['product'].name: item['quantity'] for item in cart}
+
+    def test_cart_survives_requests(self):
+        cart = Cart(self.request(self.user))
+        cart.add(self.hammer, 2)
+        cart.add(self.saw, 1)
+        cart.add(self.hammer, 1)
+        cart = Cart(self.request(self.user))
+        self.assertEqual(self.quantities(cart), {"Hammer": 3, "Saw": 1})
+        self.assertEqual(cart.get_total_price(), Decimal('65'))
+        cart.remove(self.saw)
+        self.assertEqual(self.quantities(Cart(self.request(self.user))), {"Hammer": 3})
+        Cart(self.request(self.user)).clear()
+        self.assertEqual(len(Cart(self.request(self.user))), 0)
+
+    def test_anonymous_cart_is_merged_on_login(self):
+        Cart(self.request(self.user)).add(self.hammer, 1)
+        self.session = SessionStore()
+        anonymous = Cart(self.request())
+        anonymous.add(self.hammer, 2)
+        anonymous.add(self.saw, 1)
+        request = self.request()
+        login(request, self.user)
+        self.assertEqual(self.quantities(Cart(self.request(self.user))), {"Hammer": 3, "Saw": 1})
+
+    def test_merged_quantity_is_capped(self):
+        Cart(self.request(self.user)).add(self.hammer, 15)
+        self.session = SessionStore()
+        Cart(self.request()).add(self.hammer, 15)
+        login(self.request(), self.user)
+        self.assertEqual(self.quantities(Cart(self.request(self.user))), {"Hammer": MAX_PRODUCT_QUANTITY})
+
+
+class SessionCartStorageTest(CartStorageMixin, TestCase):
+
+    def test_anonymous_cart_is_merged_on_login(self):
+        anonymous = Cart(self.request())
+        anonymous.add(self.hammer, 2)
+        login(self.request(), self.user)
+        self.assertEqual(self.quantities(Cart(self.request(self.user))), {"Hammer": 2})
+
+    def test_merged_quantity_is_capped(self):
+        Cart(self.request()).add(self.hammer, 15)
+        login(self.request(), self.user)
+        self.assertEqual(self.quantities(Cart(self.request(self.user))), {"Hammer": 15})
+
+    def test_server_storage_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ServerCartStorage(self.request())
+
+
+@override_settings(CART_STORAGE='cart.storage.CacheCartStorage')
+class CacheCartStorageTest(CartStorageMixin, TestCase):
+
+    def test_session_is_not_modified_for_user_carts(self):
+        Cart(self.request(self.user)).add(self.hammer, 1)
+        self.assertFalse(self.session.modified)
+
+
+@override_settings(CART_STORAGE='cart.storage.DatabaseCartStorage')
+class DatabaseCartStorageTest(CartStorageMixin, TestCase):
+
+    def test_adding_line_writes_single_row(self):
+        cart = Cart(self.request(self.user))
+        cart.add(self.hammer, 1)
+        cart.add(self.saw, 1)
+        with self.assertNumQueries(1):
+            cart.add(self.hammer, 1)
+        self.assertEqual(CartLine.objects.get(owner=f"user:{self.user.pk}", product=self.hammer).quantity, 2)
+        self.assertFalse(self.session.modified)
+
+    def test_batch_writes_only_touched_lines(self):
+        cart = Cart(self.request(self.user))
+        cart.add(self.hammer, 1)
+        cart.add(self.saw, 1)
+        products = {self.hammer.id: self.hammer, self.saw.id: self.saw}
+        with self.assertNumQueries(1):
+            cart.apply([{'op': 'update', 'product': self.hammer.id, 'quantity': 4}], products)
+        with self.assertNumQueries(1):
+            cart.apply([{'op': 'remove', 'product': self.saw.id}], products)
+        self.assertEqual(self.quantities(cart), {"Hammer": 4})
+        self.assertEqual(list(CartLine.objects.values_list('product', 'quantity')), [(self.hammer.id, 4)])
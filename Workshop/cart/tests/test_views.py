@@ -1 +1,32 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from ..context_processors import CART_USAGE_ATTRIBUTE
+
+
+class CartContextProcessorTest(TestCase):
+
+    def test_cart_is_not_loaded_when_template_does_not_use_it(self):
+        request = RequestFactory().get('/')
+        request.session = SessionStore()
+        render_to_string('customer/email_template.html', {'name': "User"}, request=request)
+        usage = getattr(request, CART_USAGE_ATTRIBUTE)
+        self.assertEqual((usage.renders, usage.loads), (1, 0))
+        self.assertFalse(request.session.modified)
+
+    def test_cart_widget_loads_cart(self):
+        User.objects.create_user(username="ExampleUser",
+                                 email="User@example.com",
+                                 password="ExamplePassword")
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('home'))
+        usage = getattr(response.wsgi_request, CART_USAGE_ATTRIBUTE)
+        self.assertEqual((usage.renders, usage.loads), (1, 1))
+        self.assertContains(response, "Your cart is empty")
+
+    def test_view_cart_replaces_lazy_cart(self):
+        response = self.client.get(reverse('cart_detail'))
+        usage = getattr(response.wsgi_request, CART_USAGE_ATTRIBUTE)
+        self.assertEqual((usage.renders, usage.loads), (1, 0))
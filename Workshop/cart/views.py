@@ -2,11 +2,11 @@ from http import HTTPStatus
 from typing import Dict
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import HttpResponse
-from django.shortcuts import redirect, render
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 from coupons.forms import CouponApplyForm
 from shop.models import Product
-from .cart import Cart
+from .cart import get_cart
 from .forms import CartAddProductForm
 
 
@@ -14,8 +14,8 @@ from .forms import CartAddProductForm
 def cart_add(request: WSGIRequest,
              product_id: int
              ) -> HttpResponse:
-    cart = Cart(request)
-    product = Product.objects.get(id=product_id)
+    cart = get_cart(request)
+    product = get_object_or_404(Product, id=product_id)
     form = CartAddProductForm(request.POST)
     if form.is_valid():
         cd: Dict = form.cleaned_data
@@ -28,14 +28,14 @@ def cart_add(request: WSGIRequest,
 def cart_remove(request: WSGIRequest,
                 product_id: int
                 ) -> HttpResponse:
-    cart = Cart(request)
-    product = Product.objects.get(id=product_id)
+    cart = get_cart(request)
+    product = get_object_or_404(Product, id=product_id)
     cart.remove(product)
     return redirect('cart_detail')
 
 
 def cart_detail(request: WSGIRequest) -> HttpResponse:
-    cart = Cart(request)
+    cart = get_cart(request)
     for item in cart:
         item['update_quantity_form'] = CartAddProductForm(initial={'quantity': item['quantity'],
                                                                    'update': True})
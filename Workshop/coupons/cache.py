@@ -0,0 +1,20 @@
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from .models import Coupon
+
+COUPON_KEY = 'coupons:coupon:{}'
+
+
+def get_coupon(coupon_id: int) -> Optional[Coupon]:
+    key = COUPON_KEY.format(coupon_id)
+    coupon = cache.get(key)
+    if coupon is None:
+        coupon = Coupon.objects.filter(id=coupon_id).first()
+        if coupon is not None:
+            cache.set(key, coupon, timeout=settings.COUPON_CACHE_TIMEOUT)
+    return coupon
+
+
+def invalidate_coupon(coupon_id: int) -> None:
+    cache.delete(COUPON_KEY.format(coupon_id))
@@ -1,5 +1,8 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
+from datetime import datetime
+from typing import Optional
 from django.db import models
+from django.utils import timezone
 
 
 class Coupon(models.Model):
@@ -13,3 +16,7 @@ class Coupon(models.Model):
 
     def __str__(self):
         return self.code
+
+    def is_valid(self, now: Optional[datetime] = None) -> bool:
+        now = now or timezone.now()
+        return self.active and self.valid_from <= now <= self.valid_to
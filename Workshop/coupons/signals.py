@@ -0,0 +1,13 @@
+from typing import Dict
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import invalidate_coupon
+from .models import Coupon
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_cached_coupon(sender: Coupon,
+                             instance: Coupon,
+                             **kwargs: Dict) -> None:
+    invalidate_coupon(instance.pk)
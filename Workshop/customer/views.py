@@ -1,15 +1,15 @@
 from http import HTTPStatus
 from typing import Dict
-from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.core.handlers.wsgi import WSGIRequest
-from django.core.mail import EmailMessage
+from django.db import transaction
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.template.loader import render_to_string
+from outbox.mail import queue_email
 from .forms import CustomerEditForm, CustomerLoginForm, CustomerRegisterForm
 from .models import Customer, CustomerProfile
 from .utils import create_username_from_email
@@ -20,23 +20,20 @@ def register(request: WSGIRequest) -> HttpResponse:
         customer_form = CustomerRegisterForm(request.POST)
         if customer_form.is_valid():
             cd: Dict = customer_form.cleaned_data
-            user = User.objects.create_user(username=create_username_from_email(cd),
-                                            email=cd["email"],
-                                            password=cd["password"],
-                                            first_name=cd["first_name"],
-                                            last_name=cd["last_name"])
-            Customer.objects.create(customer=user,
-                                    address=cd['address'])
+            with transaction.atomic():
+                user = User.objects.create_user(username=create_username_from_email(cd),
+                                                email=cd["email"],
+                                                password=cd["password"],
+                                                first_name=cd["first_name"],
+                                                last_name=cd["last_name"])
+                Customer.objects.create(customer=user,
+                                        address=cd['address'])
 
-            template = render_to_string('customer/email_template.html',
-                                        context={'name': user.first_name})
-            email = EmailMessage(
-                'Registration success',
-                template,
-                settings.EMAIL_HOST_USER,
-                [user.email])
-            email.fail_silently = False
-            email.send()
+                template = render_to_string('customer/email_template.html',
+                                            context={'name': user.first_name})
+                queue_email('Registration success',
+                            template,
+                            [user.email])
 
             return render(request,
                           'customer/register_done.html',
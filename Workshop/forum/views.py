@@ -5,10 +5,8 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
-from shop.models import Employee, Owner
 from .forms import CommentsForm, CreateForumForm, CreatePostForm, CreateThreadForm
 from .models import Comments, Forum, Post, Thread
-from .utils import is_employee, is_owner
 
 
 @login_required
@@ -88,12 +86,10 @@ def create_post(request: WSGIRequest) -> HttpResponse:
 @login_required
 @permission_required('shop.can_view_dashboard')
 def forum_dashboard(request: WSGIRequest) -> HttpResponse:
-    if is_employee(request.user):
-        employee = Employee.objects.get(employee=request.user)
-        forums = Forum.objects.filter(shop=employee.shop).all()
-    if is_owner(request.user):
-        owner = Owner.objects.get(owner=request.user)
-        forums = Forum.objects.filter(shop=owner.shop).all()
+    if request.role.is_employee:
+        forums = Forum.objects.filter(shop=request.role.employee.shop).all()
+    if request.role.is_owner:
+        forums = Forum.objects.filter(shop=request.role.owner.shop).all()
     return render(request,
                   'forum/forum_dashboard.html',
                   {'forums': forums},
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import OrderInformation, OrderItem
+from .models import ArchivedOrder, ArchivedOrderItem, OrderInformation, OrderItem, ProductSales, ShopSales
 
 
 @admin.register(OrderInformation)
@@ -12,3 +12,41 @@ class OrderAdmin(admin.ModelAdmin):
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('product', 'quantity', 'created_at',
                     'order_information', 'shop')
+
+
+@admin.register(ShopSales)
+class ShopSalesAdmin(admin.ModelAdmin):
+    list_display = ('day', 'shop', 'orders', 'revenue',
+                    'paid_orders', 'paid_revenue')
+
+
+@admin.register(ProductSales)
+class ProductSalesAdmin(admin.ModelAdmin):
+    list_display = ('day', 'shop', 'product', 'quantity',
+                    'revenue', 'paid_revenue')
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'surname', 'email', 'total',
+                    'paid', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'paid')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrderItem)
+class ArchivedOrderItemAdmin(admin.ModelAdmin):
+    list_display = ('id', 'order_id', 'product_name', 'shop', 'quantity',
+                    'price', 'status', 'archived_at')
+    list_filter = ('status',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
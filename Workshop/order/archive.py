@@ -0,0 +1,65 @@
+from datetime import timedelta
+from typing import Iterable, List
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+from shop.models import Product
+from .models import ArchivedOrder, ArchivedOrderItem, OrderInformation, OrderItem
+
+ORDER_FIELDS = ('id', 'braintree_id', 'name', 'surname', 'email', 'address', 'city',
+                'zipcode', 'coupon_id', 'discount', 'paid', 'total', 'created_at')
+
+
+def archive_order_items(order_items: Iterable[OrderItem],
+                        status: str) -> List[ArchivedOrderItem]:
+    order_items = list(order_items)
+    names = dict(Product.objects.filter(pk__in={order_item.product_id for order_item in order_items})
+                                .values_list('pk', 'name'))
+    ordered_at = dict(OrderInformation.objects.filter(pk__in={order_item.order_information_id
+                                                              for order_item in order_items})
+                                              .values_list('pk', 'created_at'))
+    archived = [ArchivedOrderItem(id=order_item.pk,
+                                  order_id=order_item.order_information_id,
+                                  product_id=order_item.product_id,
+                                  product_name=names.get(order_item.product_id, ''),
+                                  shop_id=order_item.shop_id,
+                                  quantity=order_item.quantity,
+                                  price=order_item.price,
+                                  status=status,
+                                  ordered_at=ordered_at[order_item.order_information_id],
+                                  created_at=order_item.created_at)
+                for order_item in order_items]
+    ArchivedOrderItem.objects.bulk_create(archived, batch_size=settings.ORDER_ARCHIVE_BATCH_SIZE)
+    OrderItem.objects.filter(id__in=[order_item.pk for order_item in archived]).delete()
+    return archived
+
+
+def archivable_orders(abandoned_before=None) -> QuerySet:
+    abandoned_before = abandoned_before or timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_ABANDONED_DAYS)
+    open_items = OrderItem.objects.filter(order_information=OuterRef('pk'))
+    return OrderInformation.objects.annotate(is_open=Exists(open_items)) \
+                                   .filter(Q(is_open=False, paid=True) |
+                                           Q(paid=False, created_at__lt=abandoned_before))
+
+
+def archive_orders(orders: Iterable[OrderInformation]) -> List[ArchivedOrder]:
+    orders = list(orders)
+    archived = [ArchivedOrder(status=ArchivedOrder.ABANDONED if order.is_open or not order.paid
+                              else ArchivedOrder.COMPLETED,
+                              **{field: getattr(order, field) for field in ORDER_FIELDS})
+                for order in orders]
+    abandoned = [order.pk for order in orders if order.is_open]
+    archive_order_items(OrderItem.objects.filter(order_information__in=abandoned),
+                        ArchivedOrderItem.ABANDONED)
+    ArchivedOrder.objects.bulk_create(archived, batch_size=settings.ORDER_ARCHIVE_BATCH_SIZE)
+    OrderInformation.objects.filter(pk__in=[order.pk for order in orders]).delete()
+    return archived
+
+
+def archive_batch(batch_size: int = None, abandoned_before=None) -> int:
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+    with transaction.atomic():
+        orders = archivable_orders(abandoned_before).select_for_update(skip_locked=True) \
+                                                    .order_by('pk')[:batch_size]
+        return len(archive_orders(orders))
@@ -1,6 +1,9 @@
+from datetime import timedelta
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.forms import ModelForm
+from django.utils import timezone
 from .models import OrderInformation
 
 
@@ -17,3 +20,17 @@ class OrderInformationForm(ModelForm):
             raise forms.ValidationError(
                 f"Email: {cd['email']} does not exists")
         return cd['email']
+
+
+class SalesReportForm(forms.Form):
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+
+    def clean(self):
+        cd = super().clean()
+        end = cd.get('end') or timezone.localdate()
+        start = cd.get('start') or end - timedelta(days=settings.SALES_REPORT_DAYS - 1)
+        if start > end:
+            raise forms.ValidationError("Start date must not be after end date")
+        cd['start'], cd['end'] = start, end
+        return cd
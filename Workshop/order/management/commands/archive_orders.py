@@ -0,0 +1,31 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ...archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = "Move completed and abandoned orders from the live order tables into the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=None,
+                            help="Orders archived per transaction, ORDER_ARCHIVE_BATCH_SIZE by default")
+        parser.add_argument('--abandoned-days',
+                            type=int,
+                            default=None,
+                            help="Archive unpaid orders older than this many days, "
+                                 "ORDER_ARCHIVE_ABANDONED_DAYS by default")
+
+    def handle(self, *args, **options):
+        abandoned_before = None
+        if options['abandoned_days'] is not None:
+            abandoned_before = timezone.now() - timedelta(days=options['abandoned_days'])
+        total = 0
+        while True:
+            archived = archive_batch(options['batch_size'], abandoned_before)
+            if not archived:
+                break
+            total += archived
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} orders"))
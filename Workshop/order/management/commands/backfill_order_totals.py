@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ...totals import backfill_order_totals
+
+
+class Command(BaseCommand):
+    help = "Fill in missing order line prices from current product prices and store the order totals"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=None,
+                            help="Order lines priced per transaction, BULK_ORDER_BATCH_SIZE by default")
+
+    def handle(self, *args, **options):
+        orders, updated = backfill_order_totals(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Stored totals for {updated} of {orders} orders"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ...rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-shop and per-product daily sales rollups from order history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=None,
+                            help="Orders aggregated per query, BULK_ORDER_BATCH_SIZE by default")
+
+    def handle(self, *args, **options):
+        orders = rebuild_rollups(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {orders} orders"))
@@ -1,9 +1,16 @@
+from decimal import Decimal
 from django.db import models
 from shop.models import Product, Shop
 from django.core.validators import MinValueValidator, \
                                    MaxValueValidator
 from coupons.models import Coupon
 
+PRICE_PLACES = Decimal('0.01')
+
+
+def unit_price(price: float) -> Decimal:
+    return Decimal(str(price)).quantize(PRICE_PLACES)
+
 
 class OrderInformation(models.Model):
     braintree_id = models.CharField(max_length=150,
@@ -33,6 +40,10 @@ class OrderInformation(models.Model):
                                    validators=[MinValueValidator(0),
                                                MaxValueValidator(100)])
     paid = models.BooleanField(default=False)
+    total = models.DecimalField(max_digits=12,
+                                decimal_places=2,
+                                default=Decimal('0.00'),
+                                editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -44,15 +55,156 @@ class OrderItem(models.Model):
                                 on_delete=models.CASCADE)
     quantity = models.IntegerField(blank=False,
                                    null=False)
+    allocated = models.IntegerField(default=0,
+                                    editable=False)
+    price = models.DecimalField(max_digits=10,
+                                decimal_places=2,
+                                null=True,
+                                editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     order_information = models.ForeignKey(OrderInformation,
                                           on_delete=models.CASCADE)
     shop = models.ForeignKey(Shop,
                              on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [models.Index(fields=['shop', 'created_at'])]
+
     def __str__(self):
         return f"Order for {self.product.name}"
 
+    def save(self, *args, **kwargs):
+        if self.price is None and self.product_id is not None:
+            self.price = unit_price(self.product.price)
+        super().save(*args, **kwargs)
+
+    @property
+    def remaining(self) -> int:
+        return self.quantity - self.allocated
+
+    @property
+    def get_total_cost(self):
+        price = self.price if self.price is not None else unit_price(self.product.price)
+        return price * self.quantity
+
+
+class ShopSales(models.Model):
+    day = models.DateField()
+    shop = models.ForeignKey(Shop,
+                             on_delete=models.CASCADE)
+    orders = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14,
+                                  decimal_places=2,
+                                  default=Decimal('0.00'))
+    paid_orders = models.IntegerField(default=0)
+    paid_quantity = models.IntegerField(default=0)
+    paid_revenue = models.DecimalField(max_digits=14,
+                                       decimal_places=2,
+                                       default=Decimal('0.00'))
+
+    class Meta:
+        unique_together = ('day', 'shop')
+
+    def __str__(self):
+        return f"Sales of {self.shop_id} on {self.day}"
+
+
+class ProductSales(models.Model):
+    day = models.DateField()
+    shop = models.ForeignKey(Shop,
+                             on_delete=models.CASCADE)
+    product = models.ForeignKey(Product,
+                                on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14,
+                                  decimal_places=2,
+                                  default=Decimal('0.00'))
+    paid_quantity = models.IntegerField(default=0)
+    paid_revenue = models.DecimalField(max_digits=14,
+                                       decimal_places=2,
+                                       default=Decimal('0.00'))
+
+    class Meta:
+        unique_together = ('day', 'shop', 'product')
+        indexes = [models.Index(fields=['shop', 'day'])]
+
+    def __str__(self):
+        return f"Sales of {self.product_id} in {self.shop_id} on {self.day}"
+
+
+class ArchivedOrder(models.Model):
+    COMPLETED = 'completed'
+    ABANDONED = 'abandoned'
+    STATUSES = ((COMPLETED, 'Completed'),
+                (ABANDONED, 'Abandoned'))
+
+    id = models.IntegerField(primary_key=True)
+    braintree_id = models.CharField(max_length=150,
+                                    blank=True)
+    name = models.CharField(max_length=50)
+    surname = models.CharField(max_length=50)
+    email = models.EmailField()
+    address = models.CharField(max_length=100)
+    city = models.CharField(max_length=50)
+    zipcode = models.CharField(max_length=10)
+    coupon = models.ForeignKey(Coupon,
+                               on_delete=models.SET_NULL,
+                               null=True,
+                               blank=True)
+    discount = models.IntegerField(default=0)
+    paid = models.BooleanField(default=False)
+    total = models.DecimalField(max_digits=12,
+                                decimal_places=2,
+                                default=Decimal('0.00'))
+    status = models.CharField(max_length=10,
+                              choices=STATUSES)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]
+
+    def __str__(self):
+        return f"Archived order for {self.name} {self.surname}"
+
+
+class ArchivedOrderItem(models.Model):
+    FULFILLED = 'fulfilled'
+    ABANDONED = 'abandoned'
+    STATUSES = ((FULFILLED, 'Fulfilled'),
+                (ABANDONED, 'Abandoned'))
+
+    id = models.IntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder,
+                              on_delete=models.DO_NOTHING,
+                              db_constraint=False,
+                              related_name='items')
+    product = models.ForeignKey(Product,
+                                on_delete=models.DO_NOTHING,
+                                db_constraint=False)
+    product_name = models.CharField(max_length=50)
+    shop = models.ForeignKey(Shop,
+                             on_delete=models.DO_NOTHING,
+                             db_constraint=False)
+    quantity = models.IntegerField()
+    price = models.DecimalField(max_digits=10,
+                                decimal_places=2,
+                                null=True)
+    status = models.CharField(max_length=10,
+                              choices=STATUSES)
+    ordered_at = models.DateTimeField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['shop', 'archived_at'])]
+
+    def __str__(self):
+        return f"Archived order for {self.product_name}"
+
     @property
     def get_total_cost(self):
-        return self.product.price * self.quantity
+        if self.price is None:
+            return None
+        return self.price * self.quantity
@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Tuple, Type
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Max, QuerySet, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from .models import ArchivedOrder, ArchivedOrderItem, OrderInformation, OrderItem, ProductSales, ShopSales
+from .totals import TOTAL_FIELD
+
+SHOP_COUNTERS = ('orders', 'quantity', 'revenue')
+PRODUCT_COUNTERS = ('quantity', 'revenue')
+PAID_PREFIX = 'paid_'
+
+
+def live_lines(order_ids: List[int]) -> QuerySet:
+    return OrderItem.objects.filter(order_information__in=order_ids) \
+                            .annotate(day=TruncDate('order_information__created_at')) \
+                            .values('day', 'shop_id', 'product_id', order_id=F('order_information_id'))
+
+
+def archived_lines(order_ids: List[int]) -> QuerySet:
+    return ArchivedOrderItem.objects.filter(order_id__in=order_ids) \
+                                    .annotate(day=TruncDate('ordered_at')) \
+                                    .values('day', 'shop_id', 'product_id', 'order_id')
+
+
+LIVE = (live_lines,)
+ALL_LINES = (live_lines, archived_lines)
+
+
+def line_rows(order_ids: List[int], sources: Iterable[Callable]) -> Iterable[Dict]:
+    for source in sources:
+        yield from source(order_ids).annotate(sold_quantity=Sum('quantity'),
+                                              sold_revenue=Sum(F('price') * F('quantity'),
+                                                               output_field=TOTAL_FIELD))
+
+
+def merge(model: Type[models.Model],
+          keys: Tuple[str, ...],
+          increments: Dict[Tuple, Dict[str, object]]) -> None:
+    if not increments:
+        return
+    model.objects.bulk_create([model(**dict(zip(keys, key))) for key in increments],
+                              batch_size=settings.BULK_ORDER_BATCH_SIZE,
+                              ignore_conflicts=True)
+    lookup = {f"{key}__in": {values[index] for values in increments}
+              for index, key in enumerate(keys)}
+    existing = {tuple(getattr(rollup, key) for key in keys): rollup
+                for rollup in model.objects.select_for_update().filter(**lookup)}
+    changed = []
+    for key, values in increments.items():
+        rollup = existing[key]
+        for field, value in values.items():
+            setattr(rollup, field, getattr(rollup, field) + value)
+        changed.append(rollup)
+    fields = list(next(iter(increments.values())))
+    model.objects.bulk_update(changed, fields, batch_size=settings.BULK_ORDER_BATCH_SIZE)
+
+
+def apply(order_ids: List[int],
+          prefix: str = '',
+          sources: Iterable[Callable] = LIVE) -> None:
+    if not order_ids:
+        return
+    shops: Dict[Tuple, Dict] = defaultdict(lambda: {'orders': set(), 'quantity': 0, 'revenue': 0})
+    products: Dict[Tuple, Dict] = defaultdict(lambda: {'quantity': 0, 'revenue': 0})
+    for row in line_rows(order_ids, sources):
+        quantity, revenue = row['sold_quantity'] or 0, row['sold_revenue'] or 0
+        shop = shops[(row['day'], row['shop_id'])]
+        shop['orders'].add(row['order_id'])
+        shop['quantity'] += quantity
+        shop['revenue'] += revenue
+        product = products[(row['day'], row['shop_id'], row['product_id'])]
+        product['quantity'] += quantity
+        product['revenue'] += revenue
+    with transaction.atomic():
+        merge(ShopSales, ('day', 'shop_id'),
+              {key: {f"{prefix}orders": len(values['orders']),
+                     f"{prefix}quantity": values['quantity'],
+                     f"{prefix}revenue": values['revenue']}
+               for key, values in shops.items()})
+        merge(ProductSales, ('day', 'shop_id', 'product_id'),
+              {key: {f"{prefix}{counter}": values[counter] for counter in PRODUCT_COUNTERS}
+               for key, values in products.items()})
+
+
+def record_orders(order_ids: Iterable[int]) -> None:
+    order_ids = list(order_ids)
+    paid = list(OrderInformation.objects.filter(pk__in=order_ids, paid=True)
+                                        .values_list('pk', flat=True))
+    apply(order_ids)
+    apply(paid, PAID_PREFIX)
+
+
+def record_payment(order_ids: Iterable[int]) -> None:
+    apply(list(order_ids), PAID_PREFIX, ALL_LINES)
+
+
+def rebuild_rollups(chunk_size: int = None) -> int:
+    chunk_size = chunk_size or settings.BULK_ORDER_BATCH_SIZE
+    rebuilt = 0
+    with transaction.atomic():
+        bound = max(model.objects.aggregate(last=Coalesce(Max('pk'), 0))['last']
+                    for model in (OrderInformation, ArchivedOrder))
+        ShopSales.objects.all().delete()
+        ProductSales.objects.all().delete()
+        for orders in (OrderInformation.objects.select_for_update(), ArchivedOrder.objects.all()):
+            orders = orders.filter(pk__lte=bound).order_by('pk').values_list('pk', 'paid')
+            last = 0
+            while True:
+                chunk = list(orders.filter(pk__gt=last)[:chunk_size])
+                if not chunk:
+                    break
+                apply([pk for pk, _ in chunk], sources=ALL_LINES)
+                apply([pk for pk, paid in chunk if paid], PAID_PREFIX, ALL_LINES)
+                last = chunk[-1][0]
+                rebuilt += len(chunk)
+    return rebuilt
+
+
+class SalesReport(object):
+
+    def __init__(self,
+                 start: date,
+                 end: date,
+                 totals: Dict,
+                 days: List[ShopSales],
+                 products: List[Dict]):
+        self.start = start
+        self.end = end
+        self.totals = totals
+        self.days = days
+        self.products = products
+
+
+def sales_report(shop_id: int,
+                 start: date,
+                 end: date,
+                 top: int = None) -> SalesReport:
+    days = ShopSales.objects.filter(shop_id=shop_id,
+                                    day__range=(start, end)).order_by('day')
+    totals = days.aggregate(**{counter: Coalesce(Sum(counter), 0)
+                               for counter in SHOP_COUNTERS + tuple(PAID_PREFIX + counter
+                                                                    for counter in SHOP_COUNTERS)})
+    products = ProductSales.objects.filter(shop_id=shop_id,
+                                           day__range=(start, end)) \
+                                   .values('product_id', 'product__name') \
+                                   .annotate(**{counter: Sum(counter)
+                                                for counter in PRODUCT_COUNTERS + tuple(PAID_PREFIX + counter
+                                                                                        for counter in PRODUCT_COUNTERS)}) \
+                                   .order_by('-revenue', 'product_id')
+    return SalesReport(start,
+                       end,
+                       totals,
+                       list(days),
+                       list(products[:top or settings.SALES_REPORT_TOP_PRODUCTS]))
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from shop.allocation import resolve_order
+from shop.models import Assortment, Category, Employee, Magazine, Product, Shop
+from ..archive import archive_batch
+from ..models import ArchivedOrder, ArchivedOrderItem, OrderInformation, OrderItem, ShopSales
+from ..rollups import rebuild_rollups, record_orders
+
+
+class OrderArchiveTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.product = Product.objects.create(name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+        magazine = Magazine.objects.create(address="SimpleMagazine")
+        magazine.assortment.add(Assortment.objects.create(product=self.product,
+                                                          quantity=100,
+                                                          category=self.category))
+        self.shop.magazine.add(magazine)
+
+    def create_order(self, quantity=1, paid=False, age=0):
+        order = OrderInformation.objects.create(name="Name",
+                                                surname="Surname",
+                                                email="User@example.com",
+                                                address="Address",
+                                                city="City",
+                                                zipcode="00-000",
+                                                paid=paid)
+        OrderItem.objects.create(product=self.product,
+                                 quantity=quantity,
+                                 order_information=order,
+                                 shop=self.shop)
+        if age:
+            OrderInformation.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=age))
+        return OrderInformation.objects.get(pk=order.pk)
+
+    def test_resolved_order_is_archived_as_completed(self):
+        order = self.create_order(quantity=3, paid=True)
+        resolve_order(order, self.shop)
+        self.assertEqual(archive_batch(), 1)
+        self.assertFalse(OrderInformation.objects.exists())
+        archived = ArchivedOrder.objects.get(pk=order.pk)
+        self.assertEqual(archived.status, ArchivedOrder.COMPLETED)
+        self.assertEqual(list(archived.items.values_list('quantity', 'price')), [(3, Decimal('20.00'))])
+
+    def test_resolved_unpaid_order_is_kept_until_paid(self):
+        order = self.create_order(quantity=3)
+        resolve_order(order, self.shop)
+        self.assertEqual(archive_batch(), 0)
+        OrderInformation.objects.filter(pk=order.pk).update(paid=True)
+        self.assertEqual(archive_batch(), 1)
+        self.assertEqual(ArchivedOrder.objects.get(pk=order.pk).status, ArchivedOrder.COMPLETED)
+
+    def test_old_unpaid_orders_are_abandoned(self):
+        old = self.create_order(age=40)
+        recent = self.create_order(age=1)
+        old_paid = self.create_order(paid=True, age=40)
+        call_command('archive_orders', batch_size=1, stdout=StringIO())
+        self.assertEqual(list(OrderInformation.objects.order_by('pk')), [recent, old_paid])
+        self.assertEqual(ArchivedOrder.objects.get().status, ArchivedOrder.ABANDONED)
+        self.assertEqual(ArchivedOrderItem.objects.get().order_id, old.pk)
+        self.assertEqual(ArchivedOrderItem.objects.get().status, ArchivedOrderItem.ABANDONED)
+
+    def test_partially_allocated_line_is_archived_with_ordered_quantity(self):
+        Assortment.objects.filter(product=self.product).update(quantity=2)
+        order = self.create_order(quantity=5, age=40)
+        resolve_order(order, self.shop)
+        self.assertEqual(archive_batch(), 1)
+        archived = ArchivedOrderItem.objects.get()
+        self.assertEqual((archived.status, archived.quantity), (ArchivedOrderItem.ABANDONED, 5))
+
+    def test_backfill_includes_archived_orders(self):
+        order = self.create_order(quantity=2, paid=True)
+        record_orders([order.pk])
+        resolve_order(order, self.shop)
+        archive_batch()
+        expected = list(ShopSales.objects.values_list('orders', 'revenue', 'paid_orders', 'paid_revenue'))
+        rebuild_rollups()
+        self.assertEqual(list(ShopSales.objects.values_list('orders', 'revenue', 'paid_orders', 'paid_revenue')),
+                         expected)
+
+    def test_history_view_lists_archived_orders(self):
+        Employee.objects.create(employee=self.user,
+                                shop=self.shop)
+        order = self.create_order(paid=True)
+        resolve_order(order, self.shop)
+        archive_batch()
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('order_history'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([archived.pk for archived in response.context['orders']], [order.pk])
+        response = self.client.get(reverse('order_history_detail', kwargs={'id': order.pk}))
+        self.assertContains(response, "Fulfilled")
+
+    def test_history_requires_shop_role(self):
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        self.assertEqual(self.client.get(reverse('order_history')).status_code, HTTPStatus.NOT_FOUND)
@@ -1,9 +1,12 @@
+from decimal import Decimal
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import transaction
 from django.db.utils import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
 from shop.models import Assortment, Category, Magazine, Producent, Product, Shop
-from ..models import OrderInformation, OrderItem
+from ..models import ArchivedOrderItem, OrderInformation, OrderItem
+from ..totals import backfill_order_totals, store_order_totals
 
 
 class OrderInformationTest(TestCase):
@@ -143,6 +146,63 @@ class OrderItemTest(TestCase):
                                               shop=self.shop)
         self.assertEqual(1, OrderItem.objects.count())
 
+    def test_price_is_captured_at_order_time(self):
+        order_item = OrderItem.objects.create(product=self.product,
+                                              quantity=3,
+                                              order_information=self.order_information,
+                                              shop=self.shop)
+        self.product.price = 25.5
+        self.product.save()
+        order_item = OrderItem.objects.get(pk=order_item.pk)
+        self.assertEqual(order_item.price, Decimal('20.00'))
+        self.assertEqual(order_item.get_total_cost, Decimal('60.00'))
+
+    def test_stored_order_total(self):
+        OrderItem.objects.create(product=self.product,
+                                 quantity=3,
+                                 order_information=self.order_information,
+                                 shop=self.shop)
+        OrderItem.objects.create(product=self.product,
+                                 quantity=1,
+                                 price=Decimal('9.99'),
+                                 order_information=self.order_information,
+                                 shop=self.shop)
+        empty_order = OrderInformation.objects.create(name="OrderName",
+                                                      surname="OrderSurname",
+                                                      email="Order@example.com",
+                                                      address="ServiceAddress",
+                                                      city="TestCity",
+                                                      zipcode="300-300")
+        with self.assertNumQueries(1):
+            store_order_totals([self.order_information.pk, empty_order.pk])
+        self.assertEqual(OrderInformation.objects.get(pk=self.order_information.pk).total, Decimal('69.99'))
+        self.assertEqual(OrderInformation.objects.get(pk=empty_order.pk).total, Decimal('0.00'))
+        OrderItem.objects.all().delete()
+        self.assertEqual(OrderInformation.objects.get(pk=self.order_information.pk).total, Decimal('69.99'))
+
+    def test_legacy_prices_and_totals_are_backfilled(self):
+        order_item = OrderItem.objects.create(product=self.product,
+                                              quantity=3,
+                                              order_information=self.order_information,
+                                              shop=self.shop)
+        ArchivedOrderItem.objects.create(id=order_item.pk + 1,
+                                         order_id=self.order_information.pk,
+                                         product=self.product,
+                                         product_name=self.product.name,
+                                         shop=self.shop,
+                                         quantity=2,
+                                         status=ArchivedOrderItem.FULFILLED,
+                                         ordered_at=timezone.now(),
+                                         created_at=timezone.now())
+        OrderItem.objects.update(price=None)
+        order_item = OrderItem.objects.get(pk=order_item.pk)
+        self.assertEqual(order_item.get_total_cost, Decimal('60.00'))
+        self.assertIsNone(ArchivedOrderItem.objects.get().get_total_cost)
+        self.assertEqual(backfill_order_totals(chunk_size=1), (1, 1))
+        self.assertEqual(OrderItem.objects.get(pk=order_item.pk).price, Decimal('20.00'))
+        self.assertEqual(ArchivedOrderItem.objects.get().price, Decimal('20.00'))
+        self.assertEqual(OrderInformation.objects.get(pk=self.order_information.pk).total, Decimal('100.00'))
+
     def test_create_order_item_with_null_values(self):
         test_cases = [{
             "product": None,
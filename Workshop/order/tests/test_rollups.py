@@ -0,0 +1,121 @@
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from shop.models import Category, Owner, Product, Shop
+from ..models import OrderInformation, OrderItem, ProductSales, ShopSales
+from ..rollups import merge, record_orders, record_payment, sales_report
+
+
+class SalesRollupTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.other_shop = Shop.objects.create(name="OtherShop",
+                                              address="OtherAdress")
+        self.hammer = self.create_product("Hammer", 20)
+        self.saw = self.create_product("Saw", 5)
+        self.today = timezone.localdate()
+
+    def create_product(self, name, price):
+        return Product.objects.create(name=name,
+                                      description="Example",
+                                      category=self.category,
+                                      price=price)
+
+    def create_order(self, *lines, paid=False):
+        order = OrderInformation.objects.create(name="Name",
+                                                surname="Surname",
+                                                email="User@example.com",
+                                                address="Address",
+                                                city="City",
+                                                zipcode="00-000",
+                                                paid=paid)
+        for product, quantity, shop in lines:
+            OrderItem.objects.create(product=product,
+                                     quantity=quantity,
+                                     order_information=order,
+                                     shop=shop)
+        return order
+
+    def test_orders_are_rolled_up_per_shop_product_and_day(self):
+        first = self.create_order((self.hammer, 2, self.shop), (self.saw, 1, self.shop))
+        second = self.create_order((self.hammer, 1, self.shop), (self.saw, 3, self.other_shop))
+        record_orders([first.pk])
+        record_orders([second.pk])
+        shop_sales = ShopSales.objects.get(shop=self.shop, day=self.today)
+        self.assertEqual((shop_sales.orders, shop_sales.quantity, shop_sales.revenue),
+                         (2, 4, Decimal('65.00')))
+        self.assertEqual(ProductSales.objects.get(shop=self.shop, product=self.hammer).quantity, 3)
+        self.assertEqual(ProductSales.objects.get(shop=self.other_shop, product=self.saw).revenue,
+                         Decimal('15.00'))
+        self.assertEqual(shop_sales.paid_orders, 0)
+
+    def test_merge_adds_to_rows_inserted_concurrently(self):
+        ShopSales.objects.create(day=self.today, shop=self.shop, orders=1, quantity=2)
+        merge(ShopSales, ('day', 'shop_id'),
+              {(self.today, self.shop.id): {'orders': 1, 'quantity': 3},
+               (self.today, self.other_shop.id): {'orders': 1, 'quantity': 1}})
+        self.assertEqual(sorted(ShopSales.objects.values_list('shop', 'orders', 'quantity')),
+                         [(self.shop.id, 2, 5), (self.other_shop.id, 1, 1)])
+
+    def test_payment_updates_paid_counters(self):
+        order = self.create_order((self.hammer, 2, self.shop))
+        record_orders([order.pk])
+        record_payment([order.pk])
+        shop_sales = ShopSales.objects.get(shop=self.shop)
+        self.assertEqual((shop_sales.paid_orders, shop_sales.paid_revenue), (1, Decimal('40.00')))
+        self.assertEqual(shop_sales.revenue, Decimal('40.00'))
+
+    def test_backfill_matches_incremental_rollups(self):
+        orders = [self.create_order((self.hammer, index + 1, self.shop), (self.saw, 1, self.other_shop),
+                                    paid=index % 2 == 0)
+                  for index in range(5)]
+        OrderInformation.objects.filter(pk=orders[0].pk).update(created_at=timezone.now() - timedelta(days=2))
+        record_orders(order.pk for order in orders)
+        incremental = sorted(ProductSales.objects.values_list('day', 'shop', 'product', 'quantity',
+                                                              'revenue', 'paid_quantity', 'paid_revenue'))
+        call_command('backfill_sales', chunk_size=2, stdout=StringIO())
+        self.assertEqual(sorted(ProductSales.objects.values_list('day', 'shop', 'product', 'quantity',
+                                                                 'revenue', 'paid_quantity', 'paid_revenue')),
+                         incremental)
+        self.assertEqual(ShopSales.objects.filter(shop=self.shop).count(), 2)
+
+    def test_report_reads_rollups_only(self):
+        order = self.create_order((self.hammer, 2, self.shop), (self.saw, 4, self.shop))
+        record_orders([order.pk])
+        OrderItem.objects.all().delete()
+        report = sales_report(self.shop.pk, self.today - timedelta(days=6), self.today)
+        self.assertEqual(report.totals['revenue'], Decimal('60.00'))
+        self.assertEqual([product['product__name'] for product in report.products], ["Hammer", "Saw"])
+
+    def test_owner_report_view(self):
+        Owner.objects.create(owner=self.user,
+                             shop=self.shop,
+                             has_ownership=True)
+        record_orders([self.create_order((self.hammer, 1, self.shop)).pk])
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('owner_sales_report'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['report'].totals['orders'], 1)
+        response = self.client.get(reverse('api_sales_report'), {'start': self.today.isoformat()})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['products'][0]['name'], "Hammer")
+
+    def test_report_requires_owner(self):
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        self.assertEqual(self.client.get(reverse('owner_sales_report')).status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('api_sales_report')).status_code, HTTPStatus.FORBIDDEN)
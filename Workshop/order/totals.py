@@ -0,0 +1,60 @@
+from decimal import Decimal
+from typing import Iterable, Set, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from .models import ArchivedOrderItem, OrderInformation, OrderItem, unit_price
+
+TOTAL_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def line_total(model, order_field: str) -> Coalesce:
+    lines = model.objects.filter(**{order_field: OuterRef('pk')}) \
+                         .values(order_field) \
+                         .annotate(total=Sum(F('price') * F('quantity'), output_field=TOTAL_FIELD)) \
+                         .values('total')
+    return Coalesce(Subquery(lines, output_field=TOTAL_FIELD), Value(Decimal('0.00')), output_field=TOTAL_FIELD)
+
+
+def order_totals(include_archived: bool = False):
+    total = line_total(OrderItem, 'order_information')
+    if include_archived:
+        total = total + line_total(ArchivedOrderItem, 'order')
+    return total
+
+
+def store_order_totals(order_ids: Iterable[int], include_archived: bool = False) -> int:
+    order_ids = list(order_ids)
+    updated = 0
+    for start in range(0, len(order_ids), settings.BULK_ORDER_BATCH_SIZE):
+        batch = order_ids[start:start + settings.BULK_ORDER_BATCH_SIZE]
+        updated += OrderInformation.objects.filter(pk__in=batch).update(total=order_totals(include_archived))
+    return updated
+
+
+def backfill_prices(model, chunk_size: int) -> Set[int]:
+    order_field = 'order_information_id' if model is OrderItem else 'order_id'
+    order_ids: Set[int] = set()
+    while True:
+        with transaction.atomic():
+            items = list(model.objects.select_for_update()
+                                      .filter(price__isnull=True,
+                                              product__isnull=False)
+                                      .select_related('product')
+                                      .order_by('pk')[:chunk_size])
+            for item in items:
+                item.price = unit_price(item.product.price)
+                order_ids.add(getattr(item, order_field))
+            model.objects.bulk_update(items, ['price'])
+        if len(items) < chunk_size:
+            return order_ids
+
+
+def backfill_order_totals(chunk_size: int = None) -> Tuple[int, int]:
+    chunk_size = chunk_size or settings.BULK_ORDER_BATCH_SIZE
+    order_ids = backfill_prices(OrderItem, chunk_size)
+    backfill_prices(ArchivedOrderItem, chunk_size)
+    order_ids.update(OrderInformation.objects.filter(total=Decimal('0.00'))
+                                             .values_list('pk', flat=True))
+    return len(order_ids), store_order_totals(sorted(order_ids), include_archived=True)
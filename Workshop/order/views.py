@@ -1,11 +1,10 @@
 from http import HTTPStatus
-from django.conf import settings
 from django.contrib.auth.decorators import permission_required
 from django.core.handlers.wsgi import WSGIRequest
-from django.core.mail import EmailMessage
 from django.http import HttpResponse
 from django.shortcuts import render
 from django.template.loader import render_to_string
+from outbox.mail import queue_email
 from .models import OrderInformation
 
 
@@ -17,13 +16,9 @@ def send_payment_link(request: WSGIRequest,
                                 context={'name': order_info.name,
                                          'surname': order_info.surname,
                                          'order_id': id})
-    email = EmailMessage(
-        'Payment Link',
-        template,
-        settings.EMAIL_HOST_USER,
-        [order_info.email])
-    email.fail_silently = False
-    email.send()
+    queue_email('Payment Link',
+                template,
+                [order_info.email])
 
     return render(request,
                   'order/order_link_sent_success.html',
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from typing import List, Tuple
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxEmail
+
+RESULT_FIELDS = ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.OUTBOX_MAX_BACKOFF))
+
+
+def describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def claim_batch(batch_size: int) -> List[OutboxEmail]:
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(OutboxEmail.objects.select_for_update(skip_locked=True)
+                                         .filter(status=OutboxEmail.PENDING,
+                                                 next_attempt_at__lte=now)
+                                         .order_by('next_attempt_at', 'id')[:batch_size])
+        OutboxEmail.objects.filter(id__in=[email.pk for email in emails]) \
+                           .update(next_attempt_at=now + timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT))
+    return emails
+
+
+def record_failure(email: OutboxEmail, error: Exception) -> None:
+    email.attempts += 1
+    email.last_error = describe(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+
+def postpone(emails: List[OutboxEmail], error: Exception) -> None:
+    for email in emails:
+        email.last_error = describe(error)
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts + 1)
+
+
+def close(connection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def deliver_batch(batch_size: int = None) -> Tuple[int, int]:
+    emails = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        postpone(emails, error)
+        failed = len(emails)
+    else:
+        for index, email in enumerate(emails):
+            message = EmailMessage(email.subject,
+                                   email.body,
+                                   email.from_email,
+                                   email.to,
+                                   connection=connection)
+            try:
+                message.send()
+            except Exception as error:
+                record_failure(email, error)
+                failed += 1
+                close(connection)
+                try:
+                    connection.open()
+                except Exception as error:
+                    postpone(emails[index + 1:], error)
+                    failed += len(emails) - index - 1
+                    break
+            else:
+                email.attempts += 1
+                email.status = OutboxEmail.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                sent += 1
+        close(connection)
+    OutboxEmail.objects.bulk_update(emails, RESULT_FIELDS)
+    return sent, failed
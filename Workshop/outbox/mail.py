@@ -0,0 +1,14 @@
+from typing import List, Optional
+from django.conf import settings
+from .models import OutboxEmail
+
+
+def queue_email(subject: str,
+                body: str,
+                to: List[str],
+                from_email: Optional[str] = None) -> OutboxEmail:
+    return OutboxEmail.objects.create(subject=subject,
+                                      body=body,
+                                      from_email=from_email or settings.EMAIL_HOST_USER,
+                                      to=list(to))
+
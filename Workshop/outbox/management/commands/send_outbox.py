@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand
+from ...delivery import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued outbox emails in batches over a single mail connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=None,
+                            help="Emails sent per connection, OUTBOX_BATCH_SIZE by default")
+        parser.add_argument('--loop',
+                            action='store_true',
+                            help="Keep polling the outbox instead of exiting once it is drained")
+        parser.add_argument('--interval',
+                            type=float,
+                            default=5,
+                            help="Seconds to wait between polls with --loop")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed"))
@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = ((PENDING, 'Pending'),
+                (SENT, 'Sent'),
+                (FAILED, 'Failed'))
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254,
+                                  blank=True,
+                                  null=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10,
+                              choices=STATUSES,
+                              default=PENDING)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True,
+                                   null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from io import StringIO
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ..delivery import claim_batch, deliver_batch
+from ..mail import queue_email
+from ..models import OutboxEmail
+
+
+class FailingEmailBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP unavailable")
+
+
+class UnreachableEmailBackend(EmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError("SMTP down")
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   EMAIL_HOST_USER='shop@example.com')
+class OutboxTest(TestCase):
+
+    def test_queue_email_does_not_send(self):
+        email = queue_email('Subject', 'Body', ['user@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.from_email, 'shop@example.com')
+
+    def test_deliver_batch_sends_pending_emails(self):
+        for index in range(3):
+            queue_email(f'Subject{index}', 'Body', ['user@example.com'])
+        self.assertEqual(deliver_batch(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists())
+        self.assertEqual(deliver_batch(), (0, 0))
+
+    def test_deliver_batch_skips_emails_not_due(self):
+        email = queue_email('Subject', 'Body', ['user@example.com'])
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(deliver_batch(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BACKEND='outbox.tests.test_outbox.FailingEmailBackend',
+                       OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_email_is_retried_with_backoff(self):
+        email = queue_email('Subject', 'Body', ['user@example.com'])
+        self.assertEqual(deliver_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("SMTP unavailable", email.last_error)
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        deliver_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.FAILED)
+
+    def test_send_outbox_command_drains_queue(self):
+        for index in range(5):
+            queue_email(f'Subject{index}', 'Body', ['user@example.com'])
+        call_command('send_outbox', batch_size=2, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND='outbox.tests.test_outbox.UnreachableEmailBackend')
+    def test_unreachable_server_postpones_batch(self):
+        email = queue_email('Subject', 'Body', ['user@example.com'])
+        self.assertEqual(deliver_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 0))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("SMTP down", email.last_error)
+        call_command('send_outbox', stdout=StringIO())
+
+    def test_claimed_emails_are_not_due_for_other_workers(self):
+        email = queue_email('Subject', 'Body', ['user@example.com'])
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(claim_batch(10), [email])
+        self.assertEqual(claim_batch(10), [])
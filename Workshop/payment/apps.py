@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PaymentConfig(AppConfig):
     name = 'payment'
+
+    def ready(self):
+        from . import signals
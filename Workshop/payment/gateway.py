@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import braintree
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class PaymentUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker(object):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self,
+                 failure_threshold: int,
+                 reset_timeout: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        with self.lock:
+            state = self.state
+            if state == self.OPEN:
+                raise PaymentUnavailable("Payment gateway is unavailable")
+            if state == self.HALF_OPEN:
+                self.opened_at = self.clock()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            with self.lock:
+                self.failures += 1
+                if state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                    self.opened_at = self.clock()
+            raise PaymentUnavailable("Payment gateway is unavailable") from error
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+        return result
+
+
+class ClientTokenPool(object):
+
+    def __init__(self,
+                 gateway: Any,
+                 size: int,
+                 ttl: float,
+                 background: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.gateway = gateway
+        self.size = size
+        self.ttl = ttl
+        self.background = background
+        self.clock = clock
+        self.tokens: Deque[Tuple[str, float]] = deque()
+        self.lock = threading.Lock()
+        self.refilling = False
+
+    def generate(self) -> str:
+        return self.gateway.client_token.generate()
+
+    def take(self) -> Optional[str]:
+        now = self.clock()
+        with self.lock:
+            while self.tokens:
+                token, expires_at = self.tokens.popleft()
+                if expires_at > now:
+                    return token
+        return None
+
+    def refill(self) -> None:
+        try:
+            while True:
+                with self.lock:
+                    if len(self.tokens) >= self.size:
+                        return
+                token = self.generate()
+                with self.lock:
+                    self.tokens.append((token, self.clock() + self.ttl))
+        except Exception:
+            return
+        finally:
+            with self.lock:
+                self.refilling = False
+
+    def schedule_refill(self) -> None:
+        with self.lock:
+            if self.refilling or len(self.tokens) >= self.size:
+                return
+            self.refilling = True
+        if self.background:
+            threading.Thread(target=self.refill, daemon=True).start()
+        else:
+            self.refill()
+
+    def get(self) -> str:
+        token = self.take()
+        self.schedule_refill()
+        if token is None:
+            token = self.generate()
+        return token
+
+
+def braintree_gateway() -> braintree.BraintreeGateway:
+    return braintree.BraintreeGateway(settings.BRAINTREE_CONF)
+
+
+_shared: Dict[str, Any] = {}
+_shared_lock = threading.RLock()
+
+
+def shared(name: str, factory: Callable[[], Any]) -> Any:
+    with _shared_lock:
+        if name not in _shared:
+            _shared[name] = factory()
+        return _shared[name]
+
+
+def reset() -> None:
+    with _shared_lock:
+        _shared.clear()
+
+
+def get_gateway() -> Any:
+    return shared('gateway', lambda: import_string(settings.BRAINTREE_GATEWAY)())
+
+
+def get_token_pool() -> ClientTokenPool:
+    return shared('token_pool', lambda: ClientTokenPool(get_gateway(),
+                                                        size=settings.BRAINTREE_CLIENT_TOKEN_POOL_SIZE,
+                                                        ttl=settings.BRAINTREE_CLIENT_TOKEN_TTL))
+
+
+def get_breaker() -> CircuitBreaker:
+    return shared('breaker', lambda: CircuitBreaker(settings.BRAINTREE_BREAKER_FAILURES,
+                                                    settings.BRAINTREE_BREAKER_RESET_TIMEOUT))
+
+
+def client_token() -> str:
+    try:
+        return get_token_pool().get()
+    except Exception as error:
+        raise PaymentUnavailable("Payment gateway is unavailable") from error
+
+
+def sale(amount: str, nonce: Optional[str]) -> Any:
+    return get_breaker().call(get_gateway().transaction.sale,
+                              {'amount': amount,
+                               'payment_method_nonce': nonce,
+                               'options': {
+                                   'submit_for_settlement': True
+                               }})
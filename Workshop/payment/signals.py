@@ -0,0 +1,12 @@
+from typing import Any, Dict
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from .gateway import reset
+
+
+@receiver(setting_changed)
+def reset_gateway(sender: Any,
+                  setting: str,
+                  **kwargs: Dict) -> None:
+    if setting.startswith('BRAINTREE_'):
+        reset()
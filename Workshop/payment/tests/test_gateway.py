@@ -0,0 +1,166 @@
+from decimal import Decimal
+from http import HTTPStatus
+from itertools import count
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from order.models import OrderInformation
+from ..gateway import CircuitBreaker, ClientTokenPool, PaymentUnavailable, get_gateway, reset
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResult(object):
+
+    def __init__(self, is_success, transaction_id=None):
+        self.is_success = is_success
+        self.transaction = type('Transaction', (object,), {'id': transaction_id})
+
+
+class FakeClientTokenGateway(object):
+
+    def __init__(self):
+        self.counter = count(1)
+        self.generated = 0
+
+    def generate(self):
+        self.generated += 1
+        return f"token-{next(self.counter)}"
+
+
+class FakeTransactionGateway(object):
+
+    def __init__(self):
+        self.sales = []
+        self.error = None
+
+    def sale(self, params):
+        self.sales.append(params)
+        if self.error is not None:
+            raise self.error
+        return FakeResult(True, transaction_id=f"txn-{len(self.sales)}")
+
+
+class FakeGateway(object):
+
+    def __init__(self):
+        self.client_token = FakeClientTokenGateway()
+        self.transaction = FakeTransactionGateway()
+
+
+class ClientTokenPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.gateway = FakeGateway()
+        self.pool = ClientTokenPool(self.gateway,
+                                    size=3,
+                                    ttl=60,
+                                    background=False,
+                                    clock=self.clock)
+
+    def test_tokens_are_served_from_pool(self):
+        self.pool.refill()
+        self.assertEqual(self.gateway.client_token.generated, 3)
+        self.assertEqual(self.pool.get(), "token-1")
+        self.assertEqual(self.pool.get(), "token-2")
+        self.assertEqual(len(self.pool.tokens), 3)
+
+    def test_expired_tokens_are_skipped(self):
+        self.pool.refill()
+        self.clock.now = 61
+        self.assertEqual(self.pool.get(), "token-7")
+        self.assertEqual(self.gateway.client_token.generated, 7)
+
+    def test_empty_pool_generates_token(self):
+        self.assertEqual(self.pool.get(), "token-4")
+        self.assertEqual(len(self.pool.tokens), 3)
+
+
+class CircuitBreakerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2,
+                                      reset_timeout=30,
+                                      clock=self.clock)
+
+    def fail(self):
+        raise TimeoutError()
+
+    def test_breaker_opens_after_failures(self):
+        for _ in range(2):
+            with self.assertRaises(PaymentUnavailable):
+                self.breaker.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        calls = []
+        with self.assertRaises(PaymentUnavailable):
+            self.breaker.call(calls.append, 1)
+        self.assertEqual(calls, [])
+
+    def test_breaker_closes_after_successful_trial(self):
+        for _ in range(2):
+            with self.assertRaises(PaymentUnavailable):
+                self.breaker.call(self.fail)
+        self.clock.now = 30
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens_breaker(self):
+        for _ in range(2):
+            with self.assertRaises(PaymentUnavailable):
+                self.breaker.call(self.fail)
+        self.clock.now = 30
+        with self.assertRaises(PaymentUnavailable):
+            self.breaker.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+
+@override_settings(BRAINTREE_GATEWAY='payment.tests.test_gateway.FakeGateway',
+                   BRAINTREE_BREAKER_FAILURES=1)
+class PaymentProcessTest(TestCase):
+
+    def setUp(self):
+        reset()
+        self.order = OrderInformation.objects.create(name="Name",
+                                                     surname="Surname",
+                                                     email="order@example.com",
+                                                     address="Address",
+                                                     city="City",
+                                                     zipcode="00-000",
+                                                     total=Decimal('40.00'))
+        self.url = reverse('payment_process', kwargs={'id': self.order.pk})
+
+    def test_gateway_is_shared(self):
+        self.assertIs(get_gateway(), get_gateway())
+
+    def test_payment_page_uses_pooled_token(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "token-")
+
+    def test_successful_sale_marks_order_paid(self):
+        response = self.client.post(self.url, {'payment_method_nonce': 'nonce'})
+        self.assertRedirects(response, reverse('payment_done'), fetch_redirect_response=False)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.paid)
+        self.assertEqual(self.order.braintree_id, "txn-1")
+        self.assertEqual(get_gateway().transaction.sales[0]['amount'], "40.00")
+
+    def test_open_breaker_skips_gateway(self):
+        get_gateway().transaction.error = TimeoutError()
+        for _ in range(2):
+            response = self.client.post(self.url, {'payment_method_nonce': 'nonce'})
+            self.assertRedirects(response, reverse('payment_canceled'), fetch_redirect_response=False)
+        self.assertEqual(len(get_gateway().transaction.sales), 1)
+        self.assertFalse(OrderInformation.objects.get(pk=self.order.pk).paid)
+
+    def test_missing_order_is_not_found(self):
+        response = self.client.get(reverse('payment_process', kwargs={'id': self.order.pk + 1}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
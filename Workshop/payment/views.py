@@ -1,41 +1,46 @@
-import braintree
-from django.shortcuts import render, redirect
-from django.conf import settings
+from django.shortcuts import get_object_or_404, render, redirect
+from django.db import transaction
 from order.models import OrderInformation, OrderItem
+from order.rollups import record_payment
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import HttpResponse
 from http import HTTPStatus
+from .gateway import PaymentUnavailable, client_token, sale
 
 def payment_process(request: WSGIRequest,
                     id: int
                     ) -> HttpResponse:
-    gateway = braintree.BraintreeGateway(settings.BRAINTREE_CONF)
-    order_info = OrderInformation.objects.get(id=id)
-    order_items = OrderItem.objects.filter(order_information=order_info).all()
-    total_cost = sum(order_item.get_total_cost for order_item in order_items)
+    order_info = get_object_or_404(OrderInformation, id=id)
+    order_items = OrderItem.objects.filter(order_information=order_info).select_related('product')
+    total_cost = order_info.total
     if request.method == "POST":
         nonce = request.POST.get('payment_method_nonce',
                                  None)
-        result = gateway.transaction.sale({
-            'amount': f"{total_cost:.2f}",
-            'payment_method_nonce': nonce,
-            'options': {
-                'submit_for_settlement': True
-            }
-        })
+        try:
+            result = sale(f"{total_cost:.2f}", nonce)
+        except PaymentUnavailable:
+            return redirect('payment_canceled')
         if result.is_success: 
-            order_info.paid = True
-            order_info.braintree_id = result.transaction.id
-            order_info.save()
+            with transaction.atomic():
+                order_info = OrderInformation.objects.select_for_update().get(pk=order_info.pk)
+                newly_paid = not order_info.paid
+                order_info.paid = True
+                order_info.braintree_id = result.transaction.id
+                order_info.save()
+                if newly_paid:
+                    record_payment([order_info.pk])
             return redirect('payment_done') 
         return redirect('payment_canceled')
     else: 
-        client_token = gateway.client_token.generate()
+        try:
+            token = client_token()
+        except PaymentUnavailable:
+            return redirect('payment_canceled')
         return render(request,
                       'payment/process.html',
                       {'order': order_info,
                        'item': order_items,
-                       'client_token': client_token},
+                       'client_token': token},
                        status=HTTPStatus.OK)
 
 def payment_done(request: WSGIRequest) -> HttpResponse:
@@ -0,0 +1,72 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+from django.db import transaction
+from order.archive import archive_order_items
+from order.models import ArchivedOrderItem, OrderInformation, OrderItem
+from .indexes import refresh_stock
+from .models import Assortment, Magazine, Shop
+
+
+class Allocation(object):
+
+    def __init__(self,
+                 fulfilled: List[OrderItem],
+                 pending: List[OrderItem],
+                 assortments: List[Assortment]):
+        self.fulfilled = fulfilled
+        self.pending = pending
+        self.assortments = assortments
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.pending
+
+
+def allocate(order_items: Iterable[OrderItem],
+             assortments: Iterable[Assortment]) -> Allocation:
+    stock: Dict[int, List[Assortment]] = defaultdict(list)
+    for assortment in assortments:
+        stock[assortment.product_id].append(assortment)
+    fulfilled, pending, changed = [], [], {}
+    for order_item in order_items:
+        for assortment in stock[order_item.product_id]:
+            if order_item.remaining <= 0:
+                break
+            taken = min(assortment.quantity, order_item.remaining)
+            if taken <= 0:
+                continue
+            assortment.quantity -= taken
+            order_item.allocated += taken
+            changed[assortment.pk] = assortment
+        if order_item.remaining <= 0:
+            fulfilled.append(order_item)
+        else:
+            pending.append(order_item)
+    return Allocation(fulfilled, pending, list(changed.values()))
+
+
+def shop_assortments(shop: Shop,
+                     product_ids: Iterable[int]):
+    stocked = Magazine.assortment.through.objects.filter(magazine__shop=shop) \
+                                                 .values('assortment_id')
+    return Assortment.objects.select_for_update() \
+                             .filter(id__in=stocked,
+                                     product__in=list(product_ids)) \
+                             .order_by('id')
+
+
+def resolve_order(order: OrderInformation,
+                  shop: Shop) -> Allocation:
+    with transaction.atomic():
+        order_items = list(OrderItem.objects.select_for_update()
+                                            .filter(order_information=order,
+                                                    shop=shop)
+                                            .order_by('id'))
+        product_ids = {order_item.product_id for order_item in order_items}
+        allocation = allocate(order_items, shop_assortments(shop, product_ids))
+        Assortment.objects.bulk_update(allocation.assortments, ['quantity'])
+        OrderItem.objects.bulk_update(allocation.pending, ['allocated'])
+        archive_order_items(allocation.fulfilled, ArchivedOrderItem.FULFILLED)
+        if allocation.assortments:
+            refresh_stock({assortment.product_id for assortment in allocation.assortments})
+    return allocation
@@ -0,0 +1,44 @@
+import time
+from typing import Any, Callable, Dict, Iterable, Type
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model
+
+CATALOG_VERSION_KEY = 'shop:catalog:version:{}'
+CATALOG_KEY = 'shop:catalog:{}:{}'
+CATALOG_MODELS = ('product', 'category', 'producent')
+
+
+def new_version() -> int:
+    return int(time.time() * 1000)
+
+
+def get_catalog_versions() -> Dict[str, int]:
+    keys = {CATALOG_VERSION_KEY.format(name): name for name in CATALOG_MODELS}
+    found = cache.get_many(keys.keys())
+    missing = {key: new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {name: found[key] for key, name in keys.items()}
+
+
+def bump_catalog_version(model: Type[Model]) -> None:
+    key = CATALOG_VERSION_KEY.format(model._meta.model_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), timeout=None)
+
+
+def cached_catalog(name: str,
+                   versions: Dict[str, int],
+                   depends_on: Iterable[str],
+                   builder: Callable[[], Any]) -> Any:
+    version = '.'.join(str(versions[model]) for model in depends_on)
+    key = CATALOG_KEY.format(name, version)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime
+from hashlib import md5
+from typing import Any, Dict, Optional, Tuple
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db.models import Count, Max
+from .models import Product
+
+STATE_ATTR = '_conditional_state'
+
+
+def make_etag(*parts: Any) -> str:
+    return md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def memoize_state(request: WSGIRequest,
+                  key: Tuple,
+                  loader) -> Any:
+    states: Dict = request.__dict__.setdefault(STATE_ATTR, {})
+    if key not in states:
+        states[key] = loader()
+    return states[key]
+
+
+def product_state(request: WSGIRequest,
+                  **lookup: Any) -> Optional[Tuple[int, datetime]]:
+    return memoize_state(request,
+                         ('product',) + tuple(sorted(lookup.items())),
+                         lambda: Product.objects.filter(**lookup)
+                                                .values_list('id', 'updated_at')
+                                                .first())
+
+
+def catalog_state(request: WSGIRequest) -> Dict:
+    return memoize_state(request,
+                         ('catalog',),
+                         lambda: Product.objects.aggregate(updated_at=Max('updated_at'),
+                                                           count=Count('id')))
+
+
+def session_state(request: WSGIRequest) -> str:
+    cart = request.session.get(settings.CART_SESSION_ID) or {}
+    return json.dumps([cart, request.session.get('coupon_id')],
+                      sort_keys=True,
+                      default=str)
+
+
+def product_detail_etag(request: WSGIRequest,
+                        name: str) -> Optional[str]:
+    state = product_state(request, name=name)
+    if state is None:
+        return None
+    return make_etag(*state, request.user.pk, request.role.name, session_state(request))
+
+
+def api_product_etag(request: WSGIRequest,
+                     pk: int,
+                     format: Optional[str] = None) -> Optional[str]:
+    state = product_state(request, id=pk)
+    if state is None:
+        return None
+    return make_etag(*state, request.accepted_media_type)
+
+
+def api_product_last_modified(request: WSGIRequest,
+                              pk: int,
+                              format: Optional[str] = None) -> Optional[datetime]:
+    state = product_state(request, id=pk)
+    return state[1] if state else None
+
+
+def api_catalog_etag(request: WSGIRequest,
+                     format: Optional[str] = None) -> str:
+    state = catalog_state(request)
+    return make_etag(state['updated_at'], state['count'],
+                     request.get_full_path(), request.accepted_media_type)
+
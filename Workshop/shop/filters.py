@@ -1,8 +1,36 @@
 import django_filters
+from django.db.models import QuerySet
+from order.models import ArchivedOrder, OrderItem
 from .models import Product
+from .search import get_search_backend
 
 
 class ProductFilter(django_filters.FilterSet):
+    name = django_filters.CharFilter(method='search')
+
     class Meta:
         model = Product
         fields = ['name', ]
+
+    def search(self,
+               queryset: QuerySet,
+               name: str,
+               value: str) -> QuerySet:
+        return get_search_backend(queryset.db).search(queryset, value)
+
+
+class OrderQueueFilter(django_filters.FilterSet):
+    paid = django_filters.BooleanFilter(field_name='order_information__paid')
+    created_at = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = OrderItem
+        fields = ['paid', 'created_at', ]
+
+
+class OrderHistoryFilter(django_filters.FilterSet):
+    created_at = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = ArchivedOrder
+        fields = ['status', 'paid', 'created_at', ]
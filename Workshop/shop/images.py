@@ -0,0 +1,102 @@
+import os
+from io import BytesIO
+from typing import Dict, Iterable, List, Tuple, Type
+from django.core.files.base import ContentFile
+from django.db.models import Model
+from django.db.models.fields.files import FieldFile
+from PIL import Image
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+DERIVATIVE_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+DERIVATIVES_DIR = 'derivatives'
+
+# (model label, image field, derivatives field)
+IMAGE_FIELDS = (
+    ('shop.Product', 'logo', 'logo_derivatives'),
+    ('shop.Producent', 'logo', 'logo_derivatives'),
+    ('shop.Category', 'category_logo', 'category_logo_derivatives'),
+)
+
+
+def render_derivatives(data: bytes) -> List[Tuple[int, str, bytes]]:
+    derivatives = []
+    with Image.open(BytesIO(data)) as source:
+        source.load()
+        has_alpha = source.mode in ('RGBA', 'LA') or 'transparency' in source.info
+        widths = sorted({min(width, source.width) for width in THUMBNAIL_WIDTHS})
+        for width in widths:
+            height = max(1, round(source.height * width / source.width))
+            thumbnail = source.convert('RGBA' if has_alpha else 'RGB') \
+                              .resize((width, height), Image.LANCZOS)
+            for name, (image_format, _, options) in DERIVATIVE_FORMATS.items():
+                image = thumbnail
+                if image_format == 'JPEG' and image.mode != 'RGB':
+                    image = Image.new('RGB', image.size, (255, 255, 255))
+                    image.paste(thumbnail, mask=thumbnail.getchannel('A'))
+                buffer = BytesIO()
+                image.save(buffer, image_format, **options)
+                derivatives.append((width, name, buffer.getvalue()))
+    return derivatives
+
+
+def derivative_name(source_name: str,
+                    width: int,
+                    derivative_format: str) -> str:
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    extension = DERIVATIVE_FORMATS[derivative_format][1]
+    return os.path.join(directory, DERIVATIVES_DIR, f'{stem}_{width}.{extension}')
+
+
+def store_derivatives(field_file: FieldFile,
+                      derivatives: Iterable[Tuple[int, str, bytes]]) -> Dict:
+    storage = field_file.storage
+    stored = {'source': field_file.name, 'widths': {}}
+    for width, derivative_format, data in derivatives:
+        name = derivative_name(field_file.name, width, derivative_format)
+        if storage.exists(name):
+            storage.delete(name)
+        name = storage.save(name, ContentFile(data))
+        stored['widths'].setdefault(str(width), {})[derivative_format] = name
+    return stored
+
+
+def read_source(field_file: FieldFile) -> bytes:
+    with field_file.storage.open(field_file.name, 'rb') as source:
+        return source.read()
+
+
+def try_render_derivatives(data: bytes) -> List[Tuple[int, str, bytes]]:
+    try:
+        return render_derivatives(data)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return []
+
+
+def generate_derivatives(field_file: FieldFile) -> Dict:
+    if not field_file:
+        return {}
+    try:
+        data = read_source(field_file)
+    except OSError:
+        return {'source': field_file.name, 'widths': {}}
+    return store_derivatives(field_file, try_render_derivatives(data))
+
+
+def image_fields_for(model: Type[Model]) -> List[Tuple[str, str]]:
+    return [(image_field, derivatives_field)
+            for label, image_field, derivatives_field in IMAGE_FIELDS
+            if label == model._meta.label]
+
+
+def needs_derivatives(instance: Model,
+                      image_field: str,
+                      derivatives_field: str) -> bool:
+    field_file = getattr(instance, image_field)
+    derivatives = getattr(instance, derivatives_field) or {}
+    if not field_file:
+        return bool(derivatives)
+    return derivatives.get('source') != field_file.name
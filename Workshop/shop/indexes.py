@@ -0,0 +1,99 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+from django.db import transaction
+from django.utils import timezone
+from .cache import bump_catalog_version
+from .models import Assortment, Producent, Product, ProducentProduct, ShopStock
+
+INDEX_BATCH_SIZE = 1000
+
+
+def producents_for_shops(shop_ids: Iterable[int]) -> Set[str]:
+    return set(Producent.objects.filter(shop__id__in=list(shop_ids))
+                                .values_list('name', flat=True))
+
+
+def producents_for_magazines(magazine_ids: Iterable[int]) -> Set[str]:
+    return set(Producent.objects.filter(shop__magazine__id__in=list(magazine_ids))
+                                .values_list('name', flat=True))
+
+
+def producents_for_assortments(assortment_ids: Iterable[int]) -> Set[str]:
+    return set(Producent.objects.filter(shop__magazine__assortment__id__in=list(assortment_ids))
+                                .values_list('name', flat=True))
+
+
+def refresh_producent_index(producents: Optional[Iterable[str]] = None) -> int:
+    products = Product.objects.all()
+    if producents is not None:
+        producents = set(producents)
+        if not producents:
+            return 0
+        products = products.filter(assortment__magazine__shop__producent__in=producents)
+    else:
+        products = products.filter(assortment__magazine__shop__producent__isnull=False)
+    pairs = set(products.values_list('assortment__magazine__shop__producent', 'id'))
+    with transaction.atomic():
+        index = ProducentProduct.objects.all()
+        if producents is not None:
+            index = index.filter(producent__in=producents)
+        index.delete()
+        ProducentProduct.objects.bulk_create([ProducentProduct(producent_id=producent,
+                                                               product_id=product)
+                                              for producent, product in pairs],
+                                             batch_size=INDEX_BATCH_SIZE)
+    return len(pairs)
+
+
+def products_for_shops(shop_ids: Iterable[int]) -> Set[int]:
+    return set(Assortment.objects.filter(magazine__shop__id__in=list(shop_ids))
+                                 .values_list('product', flat=True))
+
+
+def products_for_magazines(magazine_ids: Iterable[int]) -> Set[int]:
+    return set(Assortment.objects.filter(magazine__id__in=list(magazine_ids))
+                                 .values_list('product', flat=True))
+
+
+def products_for_assortments(assortment_ids: Iterable[int]) -> Set[int]:
+    return set(Assortment.objects.filter(id__in=list(assortment_ids))
+                                 .values_list('product', flat=True))
+
+
+def refresh_stock(products: Optional[Iterable[int]] = None) -> int:
+    assortments = Assortment.objects.filter(magazine__shop__isnull=False)
+    current = Product.objects.all()
+    stock = ShopStock.objects.all()
+    if products is not None:
+        products = set(products)
+        if not products:
+            return 0
+        assortments = assortments.filter(product__in=products)
+        current = current.filter(id__in=products)
+        stock = stock.filter(product__in=products)
+    with transaction.atomic():
+        available = dict(current.select_for_update().values_list('id', 'available_quantity'))
+        shop_quantities: Dict = defaultdict(int)
+        product_assortments: Dict = defaultdict(dict)
+        for shop, assortment, product, quantity in set(assortments.values_list('magazine__shop', 'id',
+                                                                               'product', 'quantity')):
+            shop_quantities[(shop, product)] += quantity
+            product_assortments[product][assortment] = quantity
+        stock.delete()
+        ShopStock.objects.bulk_create([ShopStock(shop_id=shop,
+                                                 product_id=product,
+                                                 quantity=quantity)
+                                       for (shop, product), quantity in shop_quantities.items()],
+                                      batch_size=INDEX_BATCH_SIZE)
+        now = timezone.now()
+        changed = []
+        for product, available_quantity in available.items():
+            quantity = sum(product_assortments[product].values())
+            if quantity != available_quantity:
+                changed.append(Product(id=product, available_quantity=quantity, updated_at=now))
+        Product.objects.bulk_update(changed,
+                                    ['available_quantity', 'updated_at'],
+                                    batch_size=INDEX_BATCH_SIZE)
+    if changed:
+        bump_catalog_version(Product)
+    return len(shop_quantities)
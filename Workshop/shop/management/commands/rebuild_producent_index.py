@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ...indexes import refresh_producent_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the producent to product index from shop magazines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('producents',
+                            nargs='*',
+                            help="Names of producents to rebuild, all when omitted")
+
+    def handle(self, *args, **options):
+        producents = options['producents'] or None
+        rows = refresh_producent_index(producents)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} producent products"))
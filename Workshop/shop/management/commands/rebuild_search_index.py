@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ...search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text product search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database',
+                            default=None,
+                            help="Database alias to rebuild the index on")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        rows = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} products with {type(backend).__name__}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ...indexes import refresh_stock
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-product and per-shop stock availability from magazine assortments"
+
+    def add_arguments(self, parser):
+        parser.add_argument('products',
+                            nargs='*',
+                            type=int,
+                            help="Ids of products to rebuild, all when omitted")
+
+    def handle(self, *args, **options):
+        products = options['products'] or None
+        rows = refresh_stock(products)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} shop stock rows"))
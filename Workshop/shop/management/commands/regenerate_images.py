@@ -0,0 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from ...cache import bump_catalog_version
+from ...images import IMAGE_FIELDS, needs_derivatives, read_source, store_derivatives, try_render_derivatives
+
+
+class Command(BaseCommand):
+    help = "Regenerate thumbnail and WebP derivatives for catalog images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers',
+                            type=int,
+                            default=cpu_count() or 1,
+                            help="Number of worker processes")
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=32,
+                            help="Images read and rendered per batch")
+        parser.add_argument('--force',
+                            action='store_true',
+                            help="Regenerate derivatives that are already up to date")
+
+    def handle(self, *args, **options):
+        total = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for label, image_field, derivatives_field in IMAGE_FIELDS:
+                model = apps.get_model(label)
+                instances = model.objects.exclude(**{image_field: ''}) \
+                                         .exclude(**{f'{image_field}__isnull': True}) \
+                                         .only('pk', image_field, derivatives_field)
+                batch = []
+                for instance in instances.iterator():
+                    if options['force'] or needs_derivatives(instance, image_field, derivatives_field):
+                        batch.append(instance)
+                    if len(batch) == options['batch_size']:
+                        total += self.process(pool, model, batch, image_field, derivatives_field)
+                        batch = []
+                total += self.process(pool, model, batch, image_field, derivatives_field)
+                bump_catalog_version(model)
+        self.stdout.write(self.style.SUCCESS(f"Regenerated derivatives for {total} images"))
+
+    def process(self, pool, model, batch, image_field, derivatives_field):
+        if not batch:
+            return 0
+        sources = []
+        for instance in batch:
+            try:
+                sources.append(read_source(getattr(instance, image_field)))
+            except OSError:
+                sources.append(b'')
+        for instance, derivatives in zip(batch, pool.map(try_render_derivatives, sources)):
+            setattr(instance, derivatives_field,
+                    store_derivatives(getattr(instance, image_field), derivatives))
+        model.objects.bulk_update(batch, [derivatives_field])
+        return len(batch)
@@ -0,0 +1,140 @@
+from typing import Callable, Dict, Optional
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+from .models import Employee, Owner, Shop
+
+ROLE_SESSION_ID = 'role'
+ROLE_VERSION_KEY = 'shop:role:version:{}'
+
+ANONYMOUS = 'anonymous'
+CUSTOMER = 'customer'
+EMPLOYEE = 'employee'
+OWNER = 'owner'
+
+
+class Role(object):
+
+    def __init__(self,
+                 name: str,
+                 employee_id: Optional[int] = None,
+                 owner_id: Optional[int] = None,
+                 shop_id: Optional[int] = None):
+        self.name = name
+        self.employee_id = employee_id
+        self.owner_id = owner_id
+        self.shop_id = shop_id
+
+    @property
+    def is_customer(self) -> bool:
+        return self.name == CUSTOMER
+
+    @property
+    def is_employee(self) -> bool:
+        return self.employee_id is not None
+
+    @property
+    def is_owner(self) -> bool:
+        return self.owner_id is not None
+
+    @cached_property
+    def employee(self) -> Optional[Employee]:
+        if self.employee_id is None:
+            return None
+        return Employee.objects.select_related('shop', 'employee') \
+                               .filter(id=self.employee_id).first()
+
+    @cached_property
+    def owner(self) -> Optional[Owner]:
+        if self.owner_id is None:
+            return None
+        return Owner.objects.select_related('shop', 'owner') \
+                            .filter(id=self.owner_id).first()
+
+    @cached_property
+    def shop(self) -> Optional[Shop]:
+        if self.shop_id is None:
+            return None
+        if self.is_owner and self.owner is not None:
+            return self.owner.shop
+        if self.is_employee and self.employee is not None:
+            return self.employee.shop
+        return Shop.objects.filter(id=self.shop_id).first()
+
+    def to_session(self,
+                   user_id: int,
+                   version: int
+                   ) -> Dict:
+        return {'user_id': user_id,
+                'version': version,
+                'name': self.name,
+                'employee_id': self.employee_id,
+                'owner_id': self.owner_id,
+                'shop_id': self.shop_id}
+
+    @classmethod
+    def from_session(cls, data: Dict) -> 'Role':
+        return cls(name=data['name'],
+                   employee_id=data['employee_id'],
+                   owner_id=data['owner_id'],
+                   shop_id=data['shop_id'])
+
+    def __str__(self):
+        return f"Role {self.name}"
+
+
+def get_role_version(user_id: int) -> int:
+    return cache.get(ROLE_VERSION_KEY.format(user_id), 0)
+
+
+def invalidate_role(user_id: int) -> None:
+    key = ROLE_VERSION_KEY.format(user_id)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def resolve_role(user: User) -> Role:
+    if not user.is_authenticated:
+        return Role(name=ANONYMOUS)
+    employee = Employee.objects.filter(employee=user) \
+                               .values('id', 'shop_id').first()
+    owner = Owner.objects.filter(owner=user) \
+                         .values('id', 'shop_id').first()
+    if owner:
+        return Role(name=OWNER,
+                    employee_id=employee['id'] if employee else None,
+                    owner_id=owner['id'],
+                    shop_id=owner['shop_id'])
+    if employee:
+        return Role(name=EMPLOYEE,
+                    employee_id=employee['id'],
+                    shop_id=employee['shop_id'])
+    return Role(name=CUSTOMER)
+
+
+def get_role(request: WSGIRequest) -> Role:
+    user = request.user
+    if not user.is_authenticated:
+        return Role(name=ANONYMOUS)
+    version = get_role_version(user.id)
+    data = request.session.get(ROLE_SESSION_ID)
+    if data and data.get('user_id') == user.id and data.get('version') == version:
+        return Role.from_session(data)
+    role = resolve_role(user)
+    request.session[ROLE_SESSION_ID] = role.to_session(user.id, version)
+    return role
+
+
+class RoleMiddleware(object):
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+
+    def __call__(self, request: WSGIRequest) -> HttpResponse:
+        request.role = get_role(request)
+        return self.get_response(request)
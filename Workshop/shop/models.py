@@ -6,6 +6,9 @@ class Producent(models.Model):
     logo = models.ImageField(blank=True,
                              null=True,
                              upload_to="media/")
+    logo_derivatives = models.JSONField(default=dict,
+                                        blank=True,
+                                        editable=False)
     name = models.CharField(max_length=50,
                             null=False,
                             blank=False,
@@ -19,6 +22,9 @@ class Category(models.Model):
     category_logo = models.ImageField(blank=True,
                                       null=True,
                                       upload_to="media/")
+    category_logo_derivatives = models.JSONField(default=dict,
+                                                 blank=True,
+                                                 editable=False)
     name = models.CharField(max_length=50,
                             null=False,
                             blank=False,
@@ -32,6 +38,9 @@ class Product(models.Model):
     logo = models.ImageField(blank=True,
                              null=True,
                              upload_to="media/")
+    logo_derivatives = models.JSONField(default=dict,
+                                        blank=True,
+                                        editable=False)
     name = models.CharField(max_length=50,
                             blank=False,
                             null=False,
@@ -41,6 +50,15 @@ class Product(models.Model):
     category = models.ForeignKey(Category,
                                  on_delete=models.CASCADE)
     description = models.TextField()
+    available_quantity = models.IntegerField(default=0,
+                                             db_index=True,
+                                             editable=False)
+    updated_at = models.DateTimeField(auto_now=True,
+                                      db_index=True)
+
+    @property
+    def in_stock(self) -> bool:
+        return self.available_quantity > 0
 
     def __str__(self):
         return f"Product with name {self.name}"
@@ -82,6 +100,34 @@ class Shop(models.Model):
         return f"{self.name}"
 
 
+class ProducentProduct(models.Model):
+    producent = models.ForeignKey(Producent,
+                                  on_delete=models.CASCADE)
+    product = models.ForeignKey(Product,
+                                on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ('producent', 'product')
+
+    def __str__(self):
+        return f"{self.product} from {self.producent}"
+
+
+class ShopStock(models.Model):
+    shop = models.ForeignKey(Shop,
+                             on_delete=models.CASCADE)
+    product = models.ForeignKey(Product,
+                                on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('shop', 'product')
+        indexes = [models.Index(fields=['product', 'quantity'])]
+
+    def __str__(self):
+        return f"{self.quantity} of {self.product} in {self.shop}"
+
+
 class Employee(models.Model):
     shop = models.ForeignKey(Shop,
                              on_delete=models.CASCADE)
@@ -0,0 +1,155 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date
+from typing import Any, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db.models import Model, Q, QuerySet
+from django.http import QueryDict
+
+KEYSET_ORDERING = ('name', 'id')
+ORDER_QUEUE_ORDERING = ('created_at', 'id')
+ORDER_HISTORY_ORDERING = ('-created_at', '-id')
+AFTER_PARAM = 'after'
+BEFORE_PARAM = 'before'
+
+
+def cursor_value(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot use {type(value).__name__} in a pagination cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(list(values), separators=(',', ':'), default=cursor_value).encode()
+    return urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str],
+                  ordering: Tuple[str, ...] = KEYSET_ORDERING
+                  ) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        payload = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload.decode())
+    except (BinasciiError, ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    return values
+
+
+def field_name(field: str) -> str:
+    return field.lstrip('-')
+
+
+def reverse_ordering(ordering: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(field_name(field) if field.startswith('-') else f'-{field}'
+                 for field in ordering)
+
+
+def seek_filter(ordering: Tuple[str, ...],
+                values: Sequence[Any],
+                forward: bool = True) -> Q:
+    condition = Q()
+    for position, field in enumerate(ordering):
+        lookup = 'gt' if forward != field.startswith('-') else 'lt'
+        step = Q(**{f'{field_name(field)}__{lookup}': values[position]})
+        for previous, value in zip(ordering[:position], values):
+            step &= Q(**{field_name(previous): value})
+        condition |= step
+    return condition
+
+
+class KeysetPage(object):
+
+    def __init__(self,
+                 object_list: List[Model],
+                 ordering: Tuple[str, ...],
+                 has_next: bool,
+                 has_previous: bool,
+                 query: str = ''):
+        self.object_list = object_list
+        self.ordering = ordering
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.query = query
+
+    def cursor_for(self, obj: Model) -> str:
+        return encode_cursor([getattr(obj, field_name(field)) for field in self.ordering])
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if self.has_next and self.object_list:
+            return self.cursor_for(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if self.has_previous and self.object_list:
+            return self.cursor_for(self.object_list[0])
+        return None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def page_query(params: QueryDict) -> str:
+    params = params.copy()
+    params.pop(AFTER_PARAM, None)
+    params.pop(BEFORE_PARAM, None)
+    return params.urlencode()
+
+
+def page_params(request: WSGIRequest,
+                keep: Sequence[str] = (),
+                ordering: Tuple[str, ...] = KEYSET_ORDERING) -> QueryDict:
+    params = QueryDict(mutable=True)
+    for name in keep:
+        if name in request.GET:
+            params[name] = request.GET[name]
+    for name in (AFTER_PARAM, BEFORE_PARAM):
+        values = decode_cursor(request.GET.get(name), ordering)
+        if values is not None:
+            params[name] = encode_cursor(values)
+    return params
+
+
+def keyset_paginate(queryset: QuerySet,
+                    request: WSGIRequest,
+                    per_page: Optional[int] = None,
+                    ordering: Tuple[str, ...] = KEYSET_ORDERING,
+                    params: Optional[QueryDict] = None
+                    ) -> KeysetPage:
+    per_page = per_page or settings.PRODUCTS_PER_PAGE
+    params = request.GET if params is None else params
+    after = decode_cursor(params.get(AFTER_PARAM), ordering)
+    before = decode_cursor(params.get(BEFORE_PARAM), ordering)
+    query = page_query(params)
+    if before is not None:
+        rows = list(queryset.filter(seek_filter(ordering, before, forward=False))
+                            .order_by(*reverse_ordering(ordering))[:per_page + 1])
+        has_previous = len(rows) > per_page
+        return KeysetPage(rows[:per_page][::-1],
+                          ordering,
+                          has_next=True,
+                          has_previous=has_previous,
+                          query=query)
+    queryset = queryset.order_by(*ordering)
+    if after is not None:
+        queryset = queryset.filter(seek_filter(ordering, after))
+    rows = list(queryset[:per_page + 1])
+    return KeysetPage(rows[:per_page],
+                      ordering,
+                      has_next=len(rows) > per_page,
+                      has_previous=after is not None,
+                      query=query)
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+from .models import ShopStock
+
+
+class Routing(object):
+
+    def __init__(self,
+                 shops: Dict[int, int],
+                 backordered: Set[int],
+                 unavailable: Set[int]):
+        self.shops = shops
+        self.backordered = backordered
+        self.unavailable = unavailable
+
+    @property
+    def is_routable(self) -> bool:
+        return not self.unavailable
+
+    @property
+    def is_split(self) -> bool:
+        return len(set(self.shops.values())) > 1
+
+    def shop_for(self, product_id: int) -> Optional[int]:
+        return self.shops.get(product_id)
+
+
+def load_stock(product_ids: Iterable[int]) -> Dict[int, Dict[int, int]]:
+    stock: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for product, shop, quantity in ShopStock.objects.filter(product__in=list(product_ids)) \
+                                                    .values_list('product', 'shop', 'quantity'):
+        stock[product][shop] = quantity
+    return stock
+
+
+def route_basket(lines: Dict[int, int],
+                 stock: Optional[Dict[int, Dict[int, int]]] = None) -> Routing:
+    if stock is None:
+        stock = load_stock(lines)
+    shops: Dict[int, int] = {}
+    remaining = {product for product in lines if stock[product]}
+    while remaining:
+        fillable: Dict[int, Set[int]] = defaultdict(set)
+        for product in remaining:
+            for shop, quantity in stock[product].items():
+                if quantity >= lines[product]:
+                    fillable[shop].add(product)
+        if not fillable:
+            break
+        shop = min(fillable, key=lambda shop: (-len(fillable[shop]), shop))
+        for product in fillable[shop]:
+            shops[product] = shop
+        remaining -= fillable[shop]
+    for product in remaining:
+        shops[product] = min(stock[product], key=lambda shop: (-stock[product][shop], shop))
+    return Routing(shops,
+                   backordered=remaining,
+                   unavailable={product for product in lines if not stock[product]})
+
+
+def reserve_stock(stock: Dict[int, Dict[int, int]],
+                  lines: Dict[int, int],
+                  routing: Routing) -> None:
+    for product, quantity in lines.items():
+        shop = routing.shop_for(product)
+        if shop is not None:
+            stock[product][shop] = max(stock[product][shop] - quantity, 0)
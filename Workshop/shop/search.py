@@ -0,0 +1,195 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Case, FloatField, Q, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from .models import Product
+
+SEARCH_ORDERING = ('-search_rank', 'id')
+SEARCH_BATCH_SIZE = 1000
+
+
+def tokenize(query: str) -> List[str]:
+    return re.findall(r'\w+', query.lower())
+
+
+class BaseSearchBackend(ABC):
+
+    def __init__(self, using: Optional[str] = None):
+        self.using = using or router.db_for_write(Product)
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def install(self) -> None:
+        pass
+
+    def index(self, products: Iterable[Product]) -> None:
+        pass
+
+    def remove(self, product_ids: Iterable[int]) -> None:
+        pass
+
+    def rebuild(self) -> int:
+        self.install()
+        self.clear()
+        count = 0
+        products = Product.objects.using(self.using).only('id', 'name', 'description')
+        batch = []
+        for product in products.iterator(chunk_size=SEARCH_BATCH_SIZE):
+            batch.append(product)
+            if len(batch) == SEARCH_BATCH_SIZE:
+                self.index(batch)
+                count += len(batch)
+                batch = []
+        self.index(batch)
+        return count + len(batch)
+
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def search(self,
+               queryset: QuerySet,
+               query: str) -> QuerySet:
+        pass
+
+    def no_results(self, queryset: QuerySet) -> QuerySet:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+
+    def search(self,
+               queryset: QuerySet,
+               query: str) -> QuerySet:
+        tokens = tokenize(query)
+        if not tokens:
+            return self.no_results(queryset)
+        condition = Q()
+        for token in tokens:
+            condition &= Q(name__icontains=token) | Q(description__icontains=token)
+        return queryset.filter(condition) \
+                       .annotate(search_rank=Case(When(name__icontains=query, then=Value(1.0)),
+                                                  default=Value(0.0),
+                                                  output_field=FloatField()))
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    table = 'shop_product_fts'
+    weights = (10.0, 1.0)
+
+    def install(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                           f"USING fts5(name, description, tokenize='porter unicode61')")
+
+    def index(self, products: Iterable[Product]) -> None:
+        products = list(products)
+        if not products:
+            return
+        self.remove(product.id for product in products)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {self.table} (rowid, name, description) VALUES (%s, %s, %s)",
+                               [(product.id, product.name, product.description)
+                                for product in products])
+
+    def remove(self, product_ids: Iterable[int]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s",
+                               [(product_id,) for product_id in product_ids])
+
+    def clear(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self,
+               queryset: QuerySet,
+               query: str) -> QuerySet:
+        tokens = tokenize(query)
+        if not tokens:
+            return self.no_results(queryset)
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        table = Product._meta.db_table
+        weights = ', '.join(str(weight) for weight in self.weights)
+        rank = RawSQL(f'SELECT -bm25({self.table}, {weights}) FROM {self.table} '
+                      f'WHERE {self.table} MATCH %s AND {self.table}.rowid = "{table}"."id"',
+                      (match,),
+                      output_field=FloatField())
+        matches = RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+                         (match,))
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    table = 'shop_product_search'
+    config = 'english'
+
+    def install(self) -> None:
+        table = Product._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                           f"product_id integer PRIMARY KEY REFERENCES {table} (id) ON DELETE CASCADE, "
+                           f"document tsvector NOT NULL)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_document "
+                           f"ON {self.table} USING gin (document)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_name_trgm "
+                           f"ON {table} USING gin (name gin_trgm_ops)")
+
+    def index(self, products: Iterable[Product]) -> None:
+        products = list(products)
+        if not products:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {self.table} (product_id, document) "
+                               f"VALUES (%s, setweight(to_tsvector('{self.config}', %s), 'A') || "
+                               f"setweight(to_tsvector('{self.config}', %s), 'B')) "
+                               f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                               [(product.id, product.name, product.description)
+                                for product in products])
+
+    def remove(self, product_ids: Iterable[int]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE product_id = ANY(%s)",
+                           (list(product_ids),))
+
+    def clear(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.table}")
+
+    def search(self,
+               queryset: QuerySet,
+               query: str) -> QuerySet:
+        if not tokenize(query):
+            return self.no_results(queryset)
+        table = Product._meta.db_table
+        tsquery = f"websearch_to_tsquery('{self.config}', %s)"
+        rank = RawSQL(f'(COALESCE((SELECT ts_rank(document, {tsquery}) FROM {self.table} '
+                      f'WHERE product_id = "{table}"."id"), 0) + similarity("{table}"."name", %s))'
+                      f'::double precision',
+                      (query, query),
+                      output_field=FloatField())
+        matches = RawSQL(f'SELECT product_id FROM {self.table} WHERE document @@ {tsquery} '
+                         f'UNION SELECT id FROM {table} WHERE name %% %s',
+                         (query, query))
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+
+VENDOR_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+
+def get_search_backend(using: Optional[str] = None) -> BaseSearchBackend:
+    using = using or router.db_for_write(Product)
+    backend_path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)(using)
+    vendor = connections[using].vendor
+    return VENDOR_BACKENDS.get(vendor, SimpleSearchBackend)(using)
@@ -1,12 +1,21 @@
-from typing import Dict
+from typing import Dict, Set, Union
 from django.contrib.auth.models import Group, Permission, User
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_save, pre_save
+from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Employee, Owner
+from .cache import bump_catalog_version
+from .images import generate_derivatives, image_fields_for, needs_derivatives
+from .indexes import producents_for_assortments, producents_for_magazines, producents_for_shops, \
+    products_for_assortments, products_for_magazines, products_for_shops, refresh_producent_index, refresh_stock
+from .middleware import invalidate_role
+from .models import Assortment, Category, Employee, Magazine, Owner, Producent, Product, Shop
+from .search import get_search_backend
 
 GROUPS = ('Employees', 'Owners')
 
+INDEXED_ACTIONS = ('post_add', 'post_remove', 'post_clear')
+
 PERMISSIONS = {
     'Employees': (
         'can_create_thread',
@@ -97,3 +106,244 @@ def create_group_permission_owner(sender: Owner,
                                                              _permission.split("_")),
                                                          content_type=content_type)
         group.permissions.add(permission)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_role(sender: Employee,
+                             instance: Employee,
+                             **kwargs: Dict
+                             ) -> None:
+    invalidate_role(instance.employee_id)
+
+
+@receiver(post_save, sender=Owner)
+@receiver(post_delete, sender=Owner)
+def invalidate_owner_role(sender: Owner,
+                          instance: Owner,
+                          **kwargs: Dict
+                          ) -> None:
+    invalidate_role(instance.owner_id)
+
+
+@receiver(m2m_changed, sender=Shop.producent.through)
+def index_shop_producent(sender: Shop,
+                         instance: Shop,
+                         action: str,
+                         reverse: bool,
+                         pk_set: Set,
+                         **kwargs: Dict
+                         ) -> None:
+    if reverse:
+        producents = {instance.pk}
+    elif action == 'pre_clear':
+        instance._indexed_producents = set(instance.producent.values_list('name', flat=True))
+        return
+    elif action == 'post_clear':
+        producents = instance.__dict__.pop('_indexed_producents', set())
+    else:
+        producents = pk_set
+    if action in INDEXED_ACTIONS:
+        refresh_producent_index(producents)
+
+
+@receiver(m2m_changed, sender=Shop.magazine.through)
+def index_shop_magazine(sender: Shop,
+                        instance: Shop,
+                        action: str,
+                        reverse: bool,
+                        pk_set: Set,
+                        **kwargs: Dict
+                        ) -> None:
+    if not reverse:
+        if action in INDEXED_ACTIONS:
+            refresh_producent_index(producents_for_shops([instance.pk]))
+    elif action == 'pre_clear':
+        instance._indexed_producents = producents_for_magazines([instance.pk])
+    elif action == 'post_clear':
+        refresh_producent_index(instance.__dict__.pop('_indexed_producents', set()))
+    elif action in INDEXED_ACTIONS:
+        refresh_producent_index(producents_for_shops(pk_set))
+
+
+@receiver(m2m_changed, sender=Magazine.assortment.through)
+def index_magazine_assortment(sender: Magazine,
+                              instance: Magazine,
+                              action: str,
+                              reverse: bool,
+                              pk_set: Set,
+                              **kwargs: Dict
+                              ) -> None:
+    if not reverse:
+        if action in INDEXED_ACTIONS:
+            refresh_producent_index(producents_for_magazines([instance.pk]))
+    elif action == 'pre_clear':
+        instance._indexed_producents = producents_for_assortments([instance.pk])
+    elif action == 'post_clear':
+        refresh_producent_index(instance.__dict__.pop('_indexed_producents', set()))
+    elif action in INDEXED_ACTIONS:
+        refresh_producent_index(producents_for_magazines(pk_set))
+
+
+@receiver(pre_delete, sender=Shop)
+@receiver(pre_delete, sender=Magazine)
+@receiver(pre_delete, sender=Assortment)
+def collect_indexed_producents(sender: type,
+                               instance: Union[Shop, Magazine, Assortment],
+                               **kwargs: Dict
+                               ) -> None:
+    lookups = {Shop: producents_for_shops,
+               Magazine: producents_for_magazines,
+               Assortment: producents_for_assortments}
+    instance._indexed_producents = lookups[sender]([instance.pk])
+
+
+@receiver(post_delete, sender=Shop)
+@receiver(post_delete, sender=Magazine)
+@receiver(post_delete, sender=Assortment)
+def refresh_indexed_producents(sender: type,
+                               instance: Union[Shop, Magazine, Assortment],
+                               **kwargs: Dict
+                               ) -> None:
+    refresh_producent_index(instance.__dict__.pop('_indexed_producents', set()))
+
+
+@receiver(m2m_changed, sender=Shop.magazine.through)
+def stock_shop_magazine(sender: Shop,
+                        instance: Union[Shop, Magazine],
+                        action: str,
+                        reverse: bool,
+                        pk_set: Set,
+                        **kwargs: Dict
+                        ) -> None:
+    if action == 'pre_clear':
+        instance._stocked_products = products_for_magazines([instance.pk]) if reverse \
+            else products_for_shops([instance.pk])
+    elif action == 'post_clear':
+        refresh_stock(instance.__dict__.pop('_stocked_products', set()))
+    elif action in INDEXED_ACTIONS:
+        refresh_stock(products_for_magazines([instance.pk] if reverse else pk_set))
+
+
+@receiver(m2m_changed, sender=Magazine.assortment.through)
+def stock_magazine_assortment(sender: Magazine,
+                              instance: Union[Magazine, Assortment],
+                              action: str,
+                              reverse: bool,
+                              pk_set: Set,
+                              **kwargs: Dict
+                              ) -> None:
+    if reverse:
+        if action in INDEXED_ACTIONS:
+            refresh_stock({instance.product_id})
+    elif action == 'pre_clear':
+        instance._stocked_products = products_for_magazines([instance.pk])
+    elif action == 'post_clear':
+        refresh_stock(instance.__dict__.pop('_stocked_products', set()))
+    elif action in INDEXED_ACTIONS:
+        refresh_stock(products_for_assortments(pk_set))
+
+
+@receiver(pre_save, sender=Assortment)
+def collect_stocked_assortment(sender: Assortment,
+                               instance: Assortment,
+                               raw: bool = False,
+                               **kwargs: Dict
+                               ) -> None:
+    if instance.pk and not raw:
+        instance._stocked_products = products_for_assortments([instance.pk])
+
+
+@receiver(post_save, sender=Assortment)
+def refresh_assortment_stock(sender: Assortment,
+                             instance: Assortment,
+                             created: bool,
+                             raw: bool = False,
+                             **kwargs: Dict
+                             ) -> None:
+    if not created and not raw:
+        refresh_stock(instance.__dict__.pop('_stocked_products', set()) | {instance.product_id})
+
+
+@receiver(pre_delete, sender=Shop)
+@receiver(pre_delete, sender=Magazine)
+def collect_stocked_products(sender: type,
+                             instance: Union[Shop, Magazine],
+                             **kwargs: Dict
+                             ) -> None:
+    lookups = {Shop: products_for_shops,
+               Magazine: products_for_magazines}
+    instance._stocked_products = lookups[sender]([instance.pk])
+
+
+@receiver(post_delete, sender=Shop)
+@receiver(post_delete, sender=Magazine)
+@receiver(post_delete, sender=Assortment)
+def refresh_stocked_products(sender: type,
+                             instance: Union[Shop, Magazine, Assortment],
+                             **kwargs: Dict
+                             ) -> None:
+    products = instance.__dict__.pop('_stocked_products', set())
+    if sender is Assortment:
+        products = {instance.product_id}
+    refresh_stock(products)
+
+
+@receiver(post_migrate)
+def install_search_backend(sender: AppConfig,
+                           using: str,
+                           **kwargs: Dict
+                           ) -> None:
+    if sender.name == 'shop':
+        get_search_backend(using).install()
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender: Product,
+                  instance: Product,
+                  using: str,
+                  **kwargs: Dict
+                  ) -> None:
+    get_search_backend(using).index([instance])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_index(sender: Product,
+                              instance: Product,
+                              using: str,
+                              **kwargs: Dict
+                              ) -> None:
+    get_search_backend(using).remove([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Producent)
+def create_image_derivatives(sender: type,
+                             instance: Union[Product, Category, Producent],
+                             raw: bool = False,
+                             **kwargs: Dict
+                             ) -> None:
+    if raw:
+        return
+    updates = {}
+    for image_field, derivatives_field in image_fields_for(sender):
+        if needs_derivatives(instance, image_field, derivatives_field):
+            updates[derivatives_field] = generate_derivatives(getattr(instance, image_field))
+    if updates:
+        sender.objects.filter(pk=instance.pk).update(**updates)
+        for derivatives_field, derivatives in updates.items():
+            setattr(instance, derivatives_field, derivatives)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Producent)
+@receiver(post_delete, sender=Producent)
+def invalidate_catalog(sender: type,
+                       instance: Union[Product, Category, Producent],
+                       **kwargs: Dict
+                       ) -> None:
+    bump_catalog_version(sender)
@@ -1,20 +1,45 @@
+from typing import Dict, List
 from django import template
-from ..models import Employee, Owner
+from django.db.models.fields.files import FieldFile
+from django.utils.html import format_html, format_html_join
 
 register = template.Library()
 
 
-@register.filter
-def is_employee(user: str) -> bool:
-    employee = Employee.objects.filter(employee=user).exists()
-    if employee:
-        return True
-    return False
+def derivative_urls(image: FieldFile,
+                    derivatives: Dict,
+                    derivative_format: str) -> List[tuple]:
+    widths = (derivatives or {}).get('widths', {})
+    return [(image.storage.url(formats[derivative_format]), width)
+            for width, formats in sorted(widths.items(), key=lambda item: int(item[0]))
+            if derivative_format in formats]
 
 
-@register.filter
-def is_owner(user: str) -> bool:
-    owner = Owner.objects.filter(owner=user).exists()
-    if owner:
-        return True
-    return False
+@register.simple_tag
+def image_srcset(image: FieldFile,
+                 derivatives: Dict,
+                 derivative_format: str = 'jpeg') -> str:
+    return format_html_join(', ', '{} {}w', derivative_urls(image, derivatives, derivative_format))
+
+
+@register.simple_tag
+def responsive_image(image: FieldFile,
+                     derivatives: Dict,
+                     sizes: str = '286px',
+                     **attrs: Dict) -> str:
+    if not image:
+        return ''
+    attributes = format_html_join(' ', '{}="{}"', attrs.items())
+    fallback = derivative_urls(image, derivatives, 'jpeg')
+    if not fallback:
+        return format_html('<img src="{}" {}>', image.url, attributes)
+    return format_html('<picture>'
+                       '<source type="image/webp" srcset="{}" sizes="{}">'
+                       '<img src="{}" srcset="{}" sizes="{}" {}>'
+                       '</picture>',
+                       image_srcset(image, derivatives, 'webp'),
+                       sizes,
+                       fallback[-1][0],
+                       image_srcset(image, derivatives, 'jpeg'),
+                       sizes,
+                       attributes)
@@ -0,0 +1,138 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from order.models import ArchivedOrderItem, OrderInformation, OrderItem
+from ..allocation import resolve_order
+from ..models import Assortment, Category, Employee, Magazine, Product, Shop
+
+
+class OrderAllocationTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.order = OrderInformation.objects.create(name="Name",
+                                                     surname="Surname",
+                                                     email="order@example.com",
+                                                     address="Address",
+                                                     city="City",
+                                                     zipcode="00-000")
+
+    def create_product(self, name, *quantities):
+        product = Product.objects.create(name=name,
+                                         description="Example",
+                                         category=self.category,
+                                         price=20)
+        for index, quantity in enumerate(quantities):
+            magazine = Magazine.objects.create(address=f"{name}Magazine{index}")
+            magazine.assortment.add(Assortment.objects.create(product=product,
+                                                              quantity=quantity,
+                                                              category=self.category))
+            self.shop.magazine.add(magazine)
+        return product
+
+    def order_item(self, product, quantity):
+        return OrderItem.objects.create(product=product,
+                                        quantity=quantity,
+                                        order_information=self.order,
+                                        shop=self.shop)
+
+    def quantities(self, product):
+        return list(Assortment.objects.filter(product=product)
+                                      .order_by('id')
+                                      .values_list('quantity', flat=True))
+
+    def test_item_is_split_across_magazines(self):
+        product = self.create_product("Product", 3, 4, 10)
+        self.order_item(product, 9)
+        allocation = resolve_order(self.order, self.shop)
+        self.assertTrue(allocation.is_complete)
+        self.assertEqual(self.quantities(product), [0, 0, 8])
+        self.assertFalse(OrderItem.objects.exists())
+        archived = ArchivedOrderItem.objects.get()
+        self.assertEqual((archived.quantity, archived.status, archived.product_name),
+                         (9, ArchivedOrderItem.FULFILLED, "Product"))
+        self.assertEqual(Product.objects.get(pk=product.pk).available_quantity, 8)
+
+    def test_partial_fulfilment_keeps_remaining_quantity(self):
+        product = self.create_product("Product", 2, 3)
+        order_item = self.order_item(product, 8)
+        allocation = resolve_order(self.order, self.shop)
+        self.assertFalse(allocation.is_complete)
+        self.assertEqual(self.quantities(product), [0, 0])
+        order_item = OrderItem.objects.get(pk=order_item.pk)
+        self.assertEqual((order_item.quantity, order_item.allocated, order_item.remaining), (8, 5, 3))
+
+    def test_line_filled_across_resolves_is_archived_whole(self):
+        product = self.create_product("Product", 2)
+        self.order_item(product, 5)
+        self.assertFalse(resolve_order(self.order, self.shop).is_complete)
+        Assortment.objects.filter(product=product).update(quantity=10)
+        self.assertTrue(resolve_order(self.order, self.shop).is_complete)
+        self.assertEqual(self.quantities(product), [7])
+        self.assertFalse(OrderItem.objects.exists())
+        archived = ArchivedOrderItem.objects.get()
+        self.assertEqual((archived.quantity, archived.get_total_cost), (5, 100))
+
+    def test_other_shop_stock_is_not_used(self):
+        product = self.create_product("Product")
+        other_shop = Shop.objects.create(name="OtherShop",
+                                         address="OtherAdress")
+        magazine = Magazine.objects.create(address="OtherMagazine")
+        magazine.assortment.add(Assortment.objects.create(product=product,
+                                                          quantity=10,
+                                                          category=self.category))
+        other_shop.magazine.add(magazine)
+        self.order_item(product, 1)
+        self.assertFalse(resolve_order(self.order, self.shop).is_complete)
+        self.assertEqual(self.quantities(product), [10])
+
+    def test_lines_routed_to_other_shop_are_left_alone(self):
+        product = self.create_product("Product", 10)
+        other_product = self.create_product("OtherProduct", 10)
+        other_shop = Shop.objects.create(name="OtherShop",
+                                         address="OtherAdress")
+        self.order_item(product, 2)
+        other_item = OrderItem.objects.create(product=other_product,
+                                              quantity=3,
+                                              order_information=self.order,
+                                              shop=other_shop)
+        allocation = resolve_order(self.order, self.shop)
+        self.assertTrue(allocation.is_complete)
+        self.assertEqual(self.quantities(product), [8])
+        self.assertEqual(self.quantities(other_product), [10])
+        self.assertEqual(list(OrderItem.objects.all()), [other_item])
+        self.assertEqual(OrderItem.objects.get().quantity, 3)
+        self.assertEqual(ArchivedOrderItem.objects.get().product_id, product.id)
+
+    def test_query_count_does_not_grow_with_order_size(self):
+        products = [self.create_product(f"Product{index}", 1, 1, 1, 1) for index in range(10)]
+        for product in products[:2]:
+            self.order_item(product, 3)
+        with CaptureQueriesContext(connection) as small:
+            resolve_order(self.order, self.shop)
+        for product in products[2:]:
+            self.order_item(product, 3)
+        with CaptureQueriesContext(connection) as large:
+            resolve_order(self.order, self.shop)
+        self.assertEqual(len(small), len(large))
+
+    def test_resolve_view(self):
+        Employee.objects.create(employee=self.user,
+                                shop=self.shop)
+        product = self.create_product("Product", 5)
+        self.order_item(product, 2)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('order_resolve', kwargs={'id': self.order.pk}))
+        self.assertRedirects(response, reverse('order_list'), fetch_redirect_response=False)
+        self.assertEqual(self.quantities(product), [3])
+        self.assertFalse(OrderItem.objects.exists())
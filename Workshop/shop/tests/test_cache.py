@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..cache import get_catalog_versions
+from ..models import Category, Producent, Product
+
+
+class CatalogCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        self.uploaded = SimpleUploadedFile('small.gif',
+                                           small_gif, content_type='image/gif')
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(category_logo=self.uploaded,
+                                                name="TestCategory")
+        self.producent = Producent.objects.create(logo=self.uploaded,
+                                                  name="TestProducent")
+        self.product = Product.objects.create(logo=self.uploaded,
+                                              name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+
+    def catalog_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('dashboard'), params or {})
+        catalog_tables = ('shop_product', 'shop_category', 'shop_producent')
+        return response, [query['sql'] for query in context.captured_queries
+                          if any(table in query['sql'] for table in catalog_tables)]
+
+    def test_warm_dashboard_skips_catalog_queries(self):
+        self.catalog_queries()
+        response, queries = self.catalog_queries()
+        self.assertEqual(queries, [])
+        self.assertEqual(list(response.context['products']), [self.product])
+        self.assertContains(response, "TestCategory")
+
+    def test_version_bump_refreshes_catalog(self):
+        self.catalog_queries()
+        versions = get_catalog_versions()
+        Category.objects.create(category_logo=self.uploaded,
+                                name="NewCategory")
+        self.assertNotEqual(get_catalog_versions()['category'], versions['category'])
+        self.assertEqual(get_catalog_versions()['producent'], versions['producent'])
+        response, queries = self.catalog_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, "NewCategory")
+
+    def test_unrelated_parameters_share_cached_page(self):
+        self.catalog_queries({'junk': '1'})
+        response, queries = self.catalog_queries({'other': '2', 'after': 'not-a-cursor'})
+        self.assertEqual(queries, [])
+        self.assertEqual(list(response.context['products']), [self.product])
+        response, queries = self.catalog_queries({'in_stock': '1'})
+        self.assertEqual(len(queries), 1)
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from http import HTTPStatus
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from order.models import OrderInformation, OrderItem
+from ..models import Assortment, Category, Magazine, Product, Shop
+
+
+class CheckoutTest(TestCase):
+
+    def setUp(self):
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        self.uploaded = SimpleUploadedFile('small.gif',
+                                           small_gif, content_type='image/gif')
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.magazine = Magazine.objects.create(address="SimpleMagazine")
+        self.shop.magazine.add(self.magazine)
+        self.data = {'name': "Name",
+                     'surname': "Surname",
+                     'email': "User@example.com",
+                     'address': "Address",
+                     'city': "City",
+                     'zipcode': "00-000"}
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+
+    def create_products(self, count, stocked=True):
+        products = []
+        for _ in range(count):
+            product = Product.objects.create(logo=self.uploaded,
+                                             name=f"Product{Product.objects.count()}",
+                                             description="Example",
+                                             category=self.category,
+                                             price=20)
+            if stocked:
+                self.magazine.assortment.add(Assortment.objects.create(product=product,
+                                                                       quantity=10,
+                                                                       category=self.category))
+            products.append(product)
+        return products
+
+    def fill_cart(self, products):
+        session = self.client.session
+        session[settings.CART_SESSION_ID] = {str(product.id): {'quantity': 2, 'price': str(product.price)}
+                                             for product in products}
+        session.save()
+
+    def checkout(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('product_order_from_chcekout'), self.data)
+        return response, len(context)
+
+    def test_checkout_creates_all_lines(self):
+        products = self.create_products(3)
+        self.fill_cart(products)
+        response, _ = self.checkout()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(OrderInformation.objects.count(), 1)
+        self.assertEqual(sorted(OrderItem.objects.values_list('product', 'quantity', 'shop')),
+                         [(product.id, 2, self.shop.id) for product in products])
+        self.assertEqual(OrderInformation.objects.get().total, Decimal('120.00'))
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        self.fill_cart(self.create_products(1))
+        self.checkout()
+        self.fill_cart(self.create_products(2))
+        _, small = self.checkout()
+        self.fill_cart(self.create_products(20))
+        _, large = self.checkout()
+        self.assertEqual(small, large)
+
+    def test_unavailable_product_writes_nothing(self):
+        products = self.create_products(2) + self.create_products(1, stocked=False)
+        self.fill_cart(products)
+        response, _ = self.checkout()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "not available")
+        self.assertFalse(OrderInformation.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
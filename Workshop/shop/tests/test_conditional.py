@@ -0,0 +1,54 @@
+from http import HTTPStatus
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Category, Product
+
+
+class ProductDetailConditionalTest(TestCase):
+
+    def setUp(self):
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        self.uploaded = SimpleUploadedFile('small.gif',
+                                           small_gif, content_type='image/gif')
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(category_logo=self.uploaded,
+                                                name="TestCategory")
+        self.product = Product.objects.create(logo=self.uploaded,
+                                              name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        self.url = reverse('product_detail', kwargs={'name': self.product.name})
+
+    def test_not_modified_skips_template(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertTemplateNotUsed(response, 'shop/product_detail.html')
+
+    def test_product_change_invalidates_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.product.description = "Changed"
+        self.product.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "Changed")
+
+    def test_cart_change_invalidates_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.post(reverse('cart_add', kwargs={'product_id': self.product.id}),
+                         data={'quantity': 1, 'update': False})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+from ..models import Category, Product
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImagePipelineTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 600), (200, 40, 40)).save(buffer, 'PNG')
+        self.uploaded = SimpleUploadedFile('large.png',
+                                           buffer.getvalue(), content_type='image/png')
+        self.category = Category.objects.create(name="TestCategory")
+        self.product = Product.objects.create(logo=self.uploaded,
+                                              name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+
+    def test_derivatives_created_on_upload(self):
+        product = Product.objects.get(pk=self.product.pk)
+        derivatives = product.logo_derivatives
+        self.assertEqual(derivatives['source'], product.logo.name)
+        self.assertEqual(sorted(derivatives['widths'], key=int), ['160', '320', '640'])
+        webp = derivatives['widths']['320']['webp']
+        self.assertTrue(default_storage.exists(webp))
+        with default_storage.open(webp) as derivative:
+            with Image.open(derivative) as image:
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(image.size, (320, 160))
+
+    def test_derivatives_are_not_regenerated_on_unrelated_save(self):
+        product = Product.objects.get(pk=self.product.pk)
+        product.price = 30
+        with mock.patch('shop.signals.generate_derivatives') as generate:
+            product.save()
+        generate.assert_not_called()
+
+    def test_responsive_image_tag(self):
+        product = Product.objects.get(pk=self.product.pk)
+        html = Template('{% load tags %}'
+                        '{% responsive_image product.logo product.logo_derivatives class="card-img" %}') \
+            .render(Context({'product': product}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('_320.webp 320w', html)
+        self.assertIn('_640.jpg 640w', html)
+        self.assertIn('class="card-img"', html)
+        self.assertNotIn(product.logo.url + '"', html)
+
+    def test_regenerate_command(self):
+        Product.objects.filter(pk=self.product.pk).update(logo_derivatives={})
+        call_command('regenerate_images', workers=1, stdout=StringIO())
+        product = Product.objects.get(pk=self.product.pk)
+        self.assertEqual(product.logo_derivatives['source'], product.logo.name)
+        self.assertIn('640', product.logo_derivatives['widths'])
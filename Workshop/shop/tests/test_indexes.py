@@ -0,0 +1,80 @@
+from http import HTTPStatus
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Assortment, Category, Magazine, Producent, ProducentProduct, Product, Shop
+
+
+class ProducentIndexTest(TestCase):
+
+    def setUp(self):
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        self.uploaded = SimpleUploadedFile('small.gif',
+                                           small_gif, content_type='image/gif')
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.producent = Producent.objects.create(name="TestProducent")
+        self.category = Category.objects.create(name="TestCategory")
+        self.product = Product.objects.create(logo=self.uploaded,
+                                              name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+        self.assortment = Assortment.objects.create(product=self.product,
+                                                    quantity=20,
+                                                    category=self.category)
+        self.magazine = Magazine.objects.create(address="SimpleMagazine")
+        self.second_magazine = Magazine.objects.create(address="SecondMagazine")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+
+    def indexed_products(self):
+        return list(ProducentProduct.objects.filter(producent=self.producent)
+                                            .values_list('product__name', flat=True))
+
+    def test_index_follows_m2m_changes(self):
+        self.shop.producent.add(self.producent)
+        self.shop.magazine.add(self.magazine)
+        self.assertEqual(self.indexed_products(), [])
+        self.magazine.assortment.add(self.assortment)
+        self.assertEqual(self.indexed_products(), ["Product"])
+        self.shop.magazine.clear()
+        self.assertEqual(self.indexed_products(), [])
+
+    def test_index_drops_deleted_magazine(self):
+        self.magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine)
+        self.shop.producent.add(self.producent)
+        self.assertEqual(self.indexed_products(), ["Product"])
+        self.magazine.delete()
+        self.assertEqual(self.indexed_products(), [])
+
+    def test_view_returns_distinct_products(self):
+        self.magazine.assortment.add(self.assortment)
+        self.second_magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine, self.second_magazine)
+        self.shop.producent.add(self.producent)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('producent_products_list',
+                                           kwargs={'producent': self.producent.name}))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['products']), [self.product])
+
+    def test_rebuild_command(self):
+        self.magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine)
+        self.shop.producent.add(self.producent)
+        ProducentProduct.objects.all().delete()
+        call_command('rebuild_producent_index', stdout=StringIO())
+        self.assertEqual(self.indexed_products(), ["Product"])
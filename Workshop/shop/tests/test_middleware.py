@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..middleware import CUSTOMER, EMPLOYEE, OWNER, ROLE_SESSION_ID
+from ..models import Employee, Owner, Shop
+
+
+class RoleMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+
+    def test_customer_role(self):
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('home'))
+        role = response.wsgi_request.role
+        self.assertEqual(role.name, CUSTOMER)
+        self.assertFalse(role.is_employee)
+        self.assertFalse(role.is_owner)
+        self.assertIsNone(role.shop)
+
+    def test_employee_role(self):
+        employee = Employee.objects.create(employee=self.user,
+                                           shop=self.shop)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        response = self.client.get(reverse('home'))
+        role = response.wsgi_request.role
+        self.assertEqual(role.name, EMPLOYEE)
+        self.assertEqual(role.employee, employee)
+        self.assertEqual(role.shop, self.shop)
+
+    def test_role_is_kept_in_session(self):
+        Owner.objects.create(owner=self.user,
+                             shop=self.shop,
+                             has_ownership=True)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        self.client.get(reverse('home'))
+        self.assertEqual(self.client.session[ROLE_SESSION_ID]['name'], OWNER)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('home'))
+        tables = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn('shop_owner', tables)
+        self.assertNotIn('shop_employee', tables)
+        self.assertTrue(response.wsgi_request.role.is_owner)
+
+    def test_role_is_dropped_on_employee_change(self):
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        self.client.get(reverse('home'))
+        self.assertEqual(self.client.session[ROLE_SESSION_ID]['name'], CUSTOMER)
+        employee = Employee.objects.create(employee=self.user,
+                                           shop=self.shop)
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.wsgi_request.role.name, EMPLOYEE)
+        employee.delete()
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.wsgi_request.role.name, CUSTOMER)
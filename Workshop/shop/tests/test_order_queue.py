@@ -0,0 +1,93 @@
+from datetime import timedelta
+from http import HTTPStatus
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from order.models import OrderInformation, OrderItem
+from ..models import Category, Employee, Product, Shop
+
+
+@override_settings(ORDERS_PER_PAGE=5)
+class OrderQueueTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.product = Product.objects.create(name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+        self.other_shop = Shop.objects.create(name="OtherShop",
+                                              address="OtherAdress")
+        Employee.objects.create(employee=self.user,
+                                shop=self.shop)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+
+    def create_orders(self, count, shop=None, paid=False):
+        items = []
+        for _ in range(count):
+            order = OrderInformation.objects.create(name="Name",
+                                                    surname="Surname",
+                                                    email="User@example.com",
+                                                    address="Address",
+                                                    city="City",
+                                                    zipcode="00-000",
+                                                    paid=paid)
+            items.append(OrderItem.objects.create(product=self.product,
+                                                  quantity=1,
+                                                  order_information=order,
+                                                  shop=shop or self.shop))
+        return items
+
+    def queue(self, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('order_list'), data or {})
+        return response, len(context)
+
+    def test_queue_pages_through_own_shop_orders(self):
+        items = self.create_orders(7)
+        self.create_orders(3, shop=self.other_shop)
+        response, _ = self.queue()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['items']), items[:5])
+        page = response.context['page']
+        response, _ = self.queue({'after': page.next_cursor})
+        self.assertEqual(list(response.context['items']), items[5:])
+        self.assertFalse(response.context['page'].has_next)
+
+    def test_query_count_does_not_grow_with_queue_size(self):
+        self.create_orders(2)
+        self.queue()
+        _, small = self.queue()
+        self.create_orders(20)
+        _, large = self.queue()
+        self.assertEqual(small, large)
+
+    def test_paid_filter_is_kept_in_page_links(self):
+        self.create_orders(2)
+        paid = self.create_orders(6, paid=True)
+        response, _ = self.queue({'paid': 'true'})
+        self.assertEqual(list(response.context['items']), paid[:5])
+        self.assertContains(response, '?paid=true&amp;after=')
+
+    def test_date_range_filter(self):
+        old, recent = self.create_orders(2)
+        OrderItem.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=10))
+        today = timezone.localdate().isoformat()
+        response, _ = self.queue({'created_at_after': today, 'created_at_before': today})
+        self.assertEqual(list(response.context['items']), [recent])
+
+    def test_queue_requires_employee(self):
+        Employee.objects.all().delete()
+        response, _ = self.queue()
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,56 @@
+from django.test import RequestFactory, TestCase, override_settings
+from ..models import Category, Product
+from ..pagination import encode_cursor, keyset_paginate
+
+
+@override_settings(PRODUCTS_PER_PAGE=2)
+class KeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.category = Category.objects.create(name="TestCategory")
+        for name in ("E", "B", "D", "A", "C"):
+            Product.objects.create(name=name,
+                                   description="Example",
+                                   category=self.category,
+                                   price=20)
+
+    def names(self, page):
+        return [product.name for product in page]
+
+    def test_first_page(self):
+        with self.assertNumQueries(1):
+            page = keyset_paginate(Product.objects.all(), self.factory.get('/'))
+            self.assertEqual(self.names(page), ["A", "B"])
+        self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+
+    def test_walk_forward_and_back(self):
+        page = keyset_paginate(Product.objects.all(), self.factory.get('/'))
+        page = keyset_paginate(Product.objects.all(),
+                               self.factory.get('/', {'after': page.next_cursor}))
+        self.assertEqual(self.names(page), ["C", "D"])
+        page = keyset_paginate(Product.objects.all(),
+                               self.factory.get('/', {'after': page.next_cursor}))
+        self.assertEqual(self.names(page), ["E"])
+        self.assertFalse(page.has_next)
+        page = keyset_paginate(Product.objects.all(),
+                               self.factory.get('/', {'before': page.previous_cursor}))
+        self.assertEqual(self.names(page), ["C", "D"])
+        self.assertTrue(page.has_previous)
+
+    def test_cursor_is_stable_after_insert(self):
+        page = keyset_paginate(Product.objects.all(), self.factory.get('/'))
+        Product.objects.create(name="AA",
+                               description="Example",
+                               category=self.category,
+                               price=20)
+        page = keyset_paginate(Product.objects.all(),
+                               self.factory.get('/', {'after': page.next_cursor}))
+        self.assertEqual(self.names(page), ["C", "D"])
+
+    def test_invalid_cursor_returns_first_page(self):
+        for cursor in ("not-a-cursor", encode_cursor(["A"])):
+            page = keyset_paginate(Product.objects.all(),
+                                   self.factory.get('/', {'after': cursor}))
+            self.assertEqual(self.names(page), ["A", "B"])
@@ -0,0 +1,79 @@
+from django.test import TestCase
+from ..models import Assortment, Category, Magazine, Product, Shop
+from ..routing import load_stock, reserve_stock, route_basket
+
+
+class OrderRoutingTest(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="TestCategory")
+        self.first_shop = Shop.objects.create(name="FirstShop",
+                                              address="FirstAdress")
+        self.second_shop = Shop.objects.create(name="SecondShop",
+                                               address="SecondAdress")
+        self.hammer = self.create_product("Hammer")
+        self.saw = self.create_product("Saw")
+        self.drill = self.create_product("Drill")
+
+    def create_product(self, name):
+        return Product.objects.create(name=name,
+                                      description="Example",
+                                      category=self.category,
+                                      price=20)
+
+    def stock(self, shop, product, quantity):
+        magazine = Magazine.objects.create(address=f"{shop.name}{product.name}")
+        magazine.assortment.add(Assortment.objects.create(product=product,
+                                                          quantity=quantity,
+                                                          category=self.category))
+        shop.magazine.add(magazine)
+
+    def test_shop_filling_most_lines_wins(self):
+        self.stock(self.first_shop, self.hammer, 5)
+        self.stock(self.second_shop, self.hammer, 5)
+        self.stock(self.second_shop, self.saw, 5)
+        routing = route_basket({self.hammer.id: 2, self.saw.id: 1})
+        self.assertEqual(routing.shops, {self.hammer.id: self.second_shop.id,
+                                         self.saw.id: self.second_shop.id})
+        self.assertFalse(routing.is_split)
+
+    def test_stock_decides_over_shop_order(self):
+        self.stock(self.first_shop, self.hammer, 1)
+        self.stock(self.second_shop, self.hammer, 10)
+        routing = route_basket({self.hammer.id: 3})
+        self.assertEqual(routing.shop_for(self.hammer.id), self.second_shop.id)
+
+    def test_basket_is_split_across_shops(self):
+        self.stock(self.first_shop, self.hammer, 5)
+        self.stock(self.second_shop, self.saw, 5)
+        routing = route_basket({self.hammer.id: 1, self.saw.id: 1})
+        self.assertTrue(routing.is_split)
+        self.assertEqual(routing.shops, {self.hammer.id: self.first_shop.id,
+                                         self.saw.id: self.second_shop.id})
+
+    def test_backordered_and_unavailable_lines(self):
+        self.stock(self.first_shop, self.hammer, 1)
+        self.stock(self.second_shop, self.hammer, 2)
+        routing = route_basket({self.hammer.id: 5, self.drill.id: 1})
+        self.assertEqual(routing.shops, {self.hammer.id: self.second_shop.id})
+        self.assertEqual(routing.backordered, {self.hammer.id})
+        self.assertEqual(routing.unavailable, {self.drill.id})
+        self.assertFalse(routing.is_routable)
+
+    def test_reserved_stock_moves_later_baskets(self):
+        self.stock(self.first_shop, self.hammer, 3)
+        self.stock(self.second_shop, self.hammer, 2)
+        stock = load_stock([self.hammer.id])
+        shops = []
+        for _ in range(3):
+            routing = route_basket({self.hammer.id: 2}, stock)
+            reserve_stock(stock, {self.hammer.id: 2}, routing)
+            shops.append(routing.shop_for(self.hammer.id))
+        self.assertEqual(shops, [self.first_shop.id, self.second_shop.id, self.first_shop.id])
+        self.assertEqual(routing.backordered, {self.hammer.id})
+        self.assertEqual(stock[self.hammer.id], {self.first_shop.id: 0, self.second_shop.id: 0})
+
+    def test_single_query(self):
+        self.stock(self.first_shop, self.hammer, 5)
+        with self.assertNumQueries(1):
+            route_basket({self.hammer.id: 1, self.saw.id: 1, self.drill.id: 1})
@@ -0,0 +1,70 @@
+from django.test import RequestFactory, TestCase, override_settings
+from ..filters import ProductFilter
+from ..models import Category, Product
+from ..pagination import keyset_paginate
+from ..search import SEARCH_ORDERING, SimpleSearchBackend, SqliteSearchBackend, get_search_backend
+
+
+class ProductSearchTest(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="TestCategory")
+        self.hammer = Product.objects.create(name="Red Hammer",
+                                             description="Steel tool for nails",
+                                             category=self.category,
+                                             price=20)
+        self.saw = Product.objects.create(name="Blue Saw",
+                                          description="Cuts wood, pairs well with a hammer",
+                                          category=self.category,
+                                          price=30)
+        self.drill = Product.objects.create(name="Drill",
+                                            description="Cordless",
+                                            category=self.category,
+                                            price=40)
+
+    def search(self, query):
+        return list(ProductFilter({'name': query},
+                                  queryset=Product.objects.all()).qs.order_by(*SEARCH_ORDERING))
+
+    def test_sqlite_backend_is_default(self):
+        self.assertIsInstance(get_search_backend(), SqliteSearchBackend)
+
+    def test_search_ranks_name_above_description(self):
+        self.assertEqual(self.search("hammer"), [self.hammer, self.saw])
+
+    def test_search_matches_prefix_and_stem(self):
+        self.assertEqual(self.search("cord"), [self.drill])
+        self.assertEqual(self.search("cut"), [self.saw])
+
+    def test_index_follows_save_and_delete(self):
+        self.drill.description = "Hammer drill"
+        self.drill.save()
+        self.assertIn(self.drill, self.search("hammer"))
+        self.hammer.delete()
+        self.assertNotIn(self.hammer.name, [product.name for product in self.search("hammer")])
+
+    def test_empty_query(self):
+        self.assertEqual(self.search("!!"), [])
+
+    @override_settings(PRODUCTS_PER_PAGE=1)
+    def test_ranked_results_paginate(self):
+        factory = RequestFactory()
+        queryset = ProductFilter({'name': "hammer"},
+                                 queryset=Product.objects.all()).qs
+        page = keyset_paginate(queryset, factory.get('/'), ordering=SEARCH_ORDERING)
+        self.assertEqual(list(page), [self.hammer])
+        page = keyset_paginate(queryset,
+                               factory.get('/', {'after': page.next_cursor}),
+                               ordering=SEARCH_ORDERING)
+        self.assertEqual(list(page), [self.saw])
+        self.assertFalse(page.has_next)
+
+    @override_settings(PRODUCT_SEARCH_BACKEND='shop.search.SimpleSearchBackend')
+    def test_configured_backend(self):
+        self.assertIsInstance(get_search_backend(), SimpleSearchBackend)
+        self.assertEqual(self.search("hammer")[0], self.hammer)
+
+    @override_settings(PRODUCT_SEARCH_BACKEND='shop.search.BaseSearchBackend')
+    def test_base_backend_cannot_be_configured(self):
+        with self.assertRaises(TypeError):
+            get_search_backend()
@@ -0,0 +1,106 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..models import Assortment, Category, Magazine, Product, Shop, ShopStock
+
+
+class StockAvailabilityTest(TestCase):
+
+    def setUp(self):
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b'
+        )
+        self.uploaded = SimpleUploadedFile('small.gif',
+                                           small_gif, content_type='image/gif')
+        self.user = User.objects.create_user(
+            username="ExampleUser",
+            email="User@example.com",
+            first_name="User",
+            last_name="User-Surname",
+            password="ExamplePassword")
+        self.category = Category.objects.create(name="TestCategory")
+        self.product = Product.objects.create(logo=self.uploaded,
+                                              name="Product",
+                                              description="Example",
+                                              category=self.category,
+                                              price=20)
+        self.other_product = Product.objects.create(logo=self.uploaded,
+                                                    name="OtherProduct",
+                                                    description="Example",
+                                                    category=self.category,
+                                                    price=30)
+        self.assortment = Assortment.objects.create(product=self.product,
+                                                    quantity=20,
+                                                    category=self.category)
+        self.magazine = Magazine.objects.create(address="SimpleMagazine")
+        self.second_magazine = Magazine.objects.create(address="SecondMagazine")
+        self.shop = Shop.objects.create(name="TestShop",
+                                        address="TestAdress")
+
+    def available(self, product):
+        return Product.objects.get(pk=product.pk).available_quantity
+
+    def shop_stock(self):
+        return dict(ShopStock.objects.values_list('shop__name', 'quantity'))
+
+    def test_stock_follows_m2m_changes(self):
+        self.magazine.assortment.add(self.assortment)
+        self.assertEqual(self.available(self.product), 0)
+        self.shop.magazine.add(self.magazine)
+        self.assertEqual(self.available(self.product), 20)
+        self.assertEqual(self.shop_stock(), {"TestShop": 20})
+        self.shop.magazine.clear()
+        self.assertEqual(self.available(self.product), 0)
+        self.assertEqual(self.shop_stock(), {})
+
+    def test_stock_follows_quantity_changes(self):
+        self.magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine)
+        self.assortment.quantity = 5
+        self.assortment.save()
+        self.assertEqual(self.available(self.product), 5)
+        self.assertEqual(self.shop_stock(), {"TestShop": 5})
+        self.assortment.delete()
+        self.assertEqual(self.available(self.product), 0)
+        self.assertEqual(self.shop_stock(), {})
+
+    def test_assortment_in_two_magazines_is_counted_once(self):
+        self.magazine.assortment.add(self.assortment)
+        self.second_magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine, self.second_magazine)
+        other_shop = Shop.objects.create(name="OtherShop",
+                                         address="OtherAdress")
+        other_shop.magazine.add(self.second_magazine)
+        self.assertEqual(self.available(self.product), 20)
+        self.assertEqual(self.shop_stock(), {"TestShop": 20, "OtherShop": 20})
+
+    def test_in_stock_listing_filter(self):
+        self.magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine)
+        self.client.login(username="ExampleUser", password="ExamplePassword")
+        url = reverse('category_products_list', kwargs={'category': self.category.name})
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['products']), 2)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'in_stock': '1'})
+        self.assertEqual(list(response.context['products']), [self.product])
+        self.assertContains(response, "In stock (20)")
+        self.assertContains(response, 'href="?"')
+        self.assertFalse([query for query in context.captured_queries
+                          if 'shop_assortment' in query['sql']])
+
+    def test_rebuild_command(self):
+        self.magazine.assortment.add(self.assortment)
+        self.shop.magazine.add(self.magazine)
+        Product.objects.update(available_quantity=0)
+        ShopStock.objects.all().delete()
+        call_command('rebuild_stock', stdout=StringIO())
+        self.assertEqual(self.available(self.product), 20)
+        self.assertEqual(self.shop_stock(), {"TestShop": 20})
@@ -28,6 +28,12 @@ urlpatterns = [
     path("order/list",
          views.order_list,
          name="order_list"),
+    path("order/history",
+         views.order_history,
+         name="order_history"),
+    path("order/history/<int:id>",
+         views.order_history_detail,
+         name="order_history_detail"),
     path("order/detail/<int:id>",
          views.order_detail,
          name="order_detail"),
@@ -91,6 +97,9 @@ urlpatterns = [
     path('owner/panel',
          views.owner_dashboard,
          name="owner_dashboard"),
+    path('owner/sales',
+         views.owner_sales_report,
+         name="owner_sales_report"),
     path('owner/task/create',
          views.create_task,
          name="create_task"),
@@ -1,20 +1,20 @@
 from typing import Dict
-from shop.models import Employee, Owner
+from django.core.handlers.wsgi import WSGIRequest
+from django.db.models import QuerySet
+
+IN_STOCK_PARAM = 'in_stock'
 
 
 def create_username_from_email(cleaned_data: Dict) -> str:
     return cleaned_data["email"].split("@")[0]
 
 
-def is_employee(user: str) -> bool:
-    employee = Employee.objects.filter(employee=user).exists()
-    if employee:
-        return True
-    return False
+def in_stock_requested(request: WSGIRequest) -> bool:
+    return request.GET.get(IN_STOCK_PARAM) == '1'
 
 
-def is_owner(user: str) -> bool:
-    owner = Owner.objects.filter(owner=user).exists()
-    if owner:
-        return True
-    return False
+def filter_in_stock(queryset: QuerySet,
+                    request: WSGIRequest) -> QuerySet:
+    if in_stock_requested(request):
+        return queryset.filter(available_quantity__gt=0)
+    return queryset
@@ -1,28 +1,38 @@
+from hashlib import md5
 from http import HTTPStatus
 from typing import Dict, List
-from itertools import product
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.models import User
 from django.core.handlers.wsgi import WSGIRequest
-from django.core.mail import EmailMessage
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
-from cart.cart import Cart
+from django.views.decorators.http import condition
+from cart.cart import get_cart
 from cart.forms import CartAddProductForm
-from order.forms import OrderInformationForm
-from order.models import OrderInformation, OrderItem
-from django.db.models import ProtectedError
-from .filters import ProductFilter
+from order.forms import OrderInformationForm, SalesReportForm
+from order.models import ArchivedOrder, ArchivedOrderItem, OrderInformation, OrderItem, unit_price
+from order.rollups import record_orders, sales_report
+from order.totals import store_order_totals
+from outbox.mail import queue_email
+from django.db import transaction
+from django.db.models import Exists, OuterRef, ProtectedError
+from .allocation import resolve_order
+from .cache import cached_catalog, get_catalog_versions
+from .conditional import product_detail_etag
+from .filters import OrderHistoryFilter, OrderQueueFilter, ProductFilter
 from .forms import AssortmentRegisterForm, CategoryRegisterForm, EmployeeEditForm, EmployeeLoginForm, \
     EmployeeRegisterForm, MagazineRegisterForm, OwnerEditForm, OwnerLoginForm, ProducentRegisterForm, \
     ProductRegisterForm, TaskForm, TaskStatusForm, NewEmployeeRegisterForm
 from .models import Assortment, Category, Employee, EmployeeProfile, Magazine, Owner, OwnerProfile, Producent, \
-    Product, Shop, Task, NewEmployee
-from .utils import create_username_from_email, is_employee, is_owner
+    Product, Task, NewEmployee
+from .pagination import ORDER_HISTORY_ORDERING, ORDER_QUEUE_ORDERING, keyset_paginate, page_params
+from .routing import route_basket
+from .search import SEARCH_ORDERING
+from .utils import IN_STOCK_PARAM, create_username_from_email, filter_in_stock, in_stock_requested
 
 
 def register(request: WSGIRequest) -> HttpResponse:
@@ -31,23 +41,20 @@ def register(request: WSGIRequest) -> HttpResponse:
         if employee_form.is_valid():
             cd: Dict = employee_form.cleaned_data
             if NewEmployee.objects.filter(email=cd['email']).exists():
-                user = User.objects.create_user(username=create_username_from_email(cd),
-                                            email=cd["email"],
-                                            password=cd["password"],
-                                            first_name=cd["first_name"],
-                                            last_name=cd["last_name"])
-                Employee.objects.create(employee=user,
-                                        shop=cd['shop'])
-                NewEmployee.objects.get(email=cd['email']).delete()
-                template = render_to_string('shop/employee/email_template.html',
-                                            context={'name': user.first_name})
-                email = EmailMessage(
-                    'Registration success',
-                    template,
-                    settings.EMAIL_HOST_USER,
-                    [user.email])
-                email.fail_silently = False
-                email.send()
+                with transaction.atomic():
+                    user = User.objects.create_user(username=create_username_from_email(cd),
+                                                    email=cd["email"],
+                                                    password=cd["password"],
+                                                    first_name=cd["first_name"],
+                                                    last_name=cd["last_name"])
+                    Employee.objects.create(employee=user,
+                                            shop=cd['shop'])
+                    NewEmployee.objects.filter(email=cd['email']).delete()
+                    template = render_to_string('shop/employee/email_template.html',
+                                                context={'name': user.first_name})
+                    queue_email('Registration success',
+                                template,
+                                [user.email])
                 return render(request,
                             'shop/employee/register_done.html',
                             {'form': cd},
@@ -140,25 +147,38 @@ def index(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def dashboard(request: WSGIRequest) -> HttpResponse:
-    filter = ProductFilter(request.GET, queryset=Product.objects.all())
-    producents = Producent.objects.all()
-    categories = Category.objects.all()
-    products = Product.objects.all()
-    cart_product_form = CartAddProductForm()
     name = request.GET.get("name")
     if name:
         return redirect('products_list', filter=name)
+    versions = get_catalog_versions()
+    producents = cached_catalog('producents', versions, ('producent',),
+                                lambda: list(Producent.objects.all()))
+    categories = cached_catalog('categories', versions, ('category',),
+                                lambda: list(Category.objects.all()))
+    params = page_params(request, (IN_STOCK_PARAM,))
+    cursor = md5(params.urlencode().encode()).hexdigest()
+    page = cached_catalog(f'dashboard_products:{cursor}', versions, ('product',),
+                          lambda: keyset_paginate(filter_in_stock(Product.objects.all(), request),
+                                                   request,
+                                                   params=params))
+    filter = ProductFilter(request.GET, queryset=Product.objects.all())
+    cart_product_form = CartAddProductForm()
     return render(request,
                   'shop/dashboard.html',
                   {'filter': filter,
                    'producents': producents,
                    'categories': categories,
-                   'products:': products,
+                   'products': page,
+                   'page': page,
+                   'in_stock': in_stock_requested(request),
+                   'catalog_versions': versions,
+                   'catalog_cache_timeout': settings.CATALOG_CACHE_TIMEOUT,
                    'cart_product_form': cart_product_form},
                   status=HTTPStatus.OK)
 
 
 @login_required
+@condition(etag_func=product_detail_etag)
 def product_detail(request: WSGIRequest,
                    name: str
                    ) -> HttpResponse:
@@ -175,20 +195,27 @@ def product_order(request: WSGIRequest,
                   ) -> HttpResponse:
     if request.method == "POST":
         order_form = OrderInformationForm(request.POST)
-        product = Product.objects.get(name=product)
-        shop = Shop.objects.filter(magazine__assortment__product=product).first()
+        product = get_object_or_404(Product, name=product)
+        routing = route_basket({product.id: 1})
+        if not routing.is_routable:
+            messages.error(request, "Product is not available in any shop")
+            return redirect('dashboard')
         if order_form.is_valid():
             cd: Dict = order_form.cleaned_data
-            order_info = OrderInformation.objects.create(name=cd['name'],
-                                                         surname=cd['surname'],
-                                                         email=cd['email'],
-                                                         address=cd['address'],
-                                                         city=cd['city'],
-                                                         zipcode=cd['zipcode'])
-            order_item = OrderItem.objects.create(product=product,
-                                                  quantity=1,
-                                                  order_information=order_info,
-                                                  shop=shop)
+            with transaction.atomic():
+                order_info = OrderInformation.objects.create(name=cd['name'],
+                                                             surname=cd['surname'],
+                                                             email=cd['email'],
+                                                             address=cd['address'],
+                                                             city=cd['city'],
+                                                             zipcode=cd['zipcode'])
+                OrderItem.objects.create(product=product,
+                                         quantity=1,
+                                         price=unit_price(product.price),
+                                         order_information=order_info,
+                                         shop_id=routing.shop_for(product.id))
+                store_order_totals([order_info.pk])
+                record_orders([order_info.pk])
             return render(request,
                           'order/order_done.html',
                           {'user': request.user},
@@ -204,36 +231,39 @@ def product_order(request: WSGIRequest,
 
 @login_required
 def product_order_from_checkout(request: WSGIRequest) -> HttpResponse:
-    cart = Cart(request)
-    products: List[Product] = [] 
-    quantities: List[int] = []
+    cart = get_cart(request)
     if not cart.cart: 
         return render(request,
                       'cart/cart_empty.html',
                       status=HTTPStatus.NOT_FOUND)
-    for item in cart: 
-        products.append(item['product'])
-        quantities.append(item['quantity'])
+    items: List[Dict] = list(cart)
+    products: List[Product] = [item['product'] for item in items]
     if request.method == "POST":
         order_form = OrderInformationForm(request.POST)
         if order_form.is_valid(): 
             cd: Dict = order_form.cleaned_data
-            order_info = OrderInformation.objects.create(name=cd['name'],
-                                                         surname=cd['surname'],
-                                                         email=cd['email'],
-                                                         address=cd['address'],
-                                                         city=cd['city'],
-                                                         zipcode=cd['zipcode'])
-            for product, quantity in zip(products, quantities):
-                shop = Shop.objects.filter(magazine__assortment__product=product).first()
-                OrderItem.objects.create(product=product,
-                                         quantity=quantity,
-                                         order_information=order_info,
-                                         shop=shop)
-            return render(request,
-                        'order/order_done.html',
-                        {'user': request.user},
-                        status=HTTPStatus.OK)
+            routing = route_basket({item['product'].id: item['quantity'] for item in items})
+            if routing.is_routable:
+                with transaction.atomic():
+                    order_info = OrderInformation.objects.create(name=cd['name'],
+                                                                 surname=cd['surname'],
+                                                                 email=cd['email'],
+                                                                 address=cd['address'],
+                                                                 city=cd['city'],
+                                                                 zipcode=cd['zipcode'])
+                    OrderItem.objects.bulk_create([OrderItem(product=item['product'],
+                                                             quantity=item['quantity'],
+                                                             price=unit_price(item['product'].price),
+                                                             order_information=order_info,
+                                                             shop_id=routing.shop_for(item['product'].id))
+                                                   for item in items])
+                    store_order_totals([order_info.pk])
+                    record_orders([order_info.pk])
+                return render(request,
+                            'order/order_done.html',
+                            {'user': request.user},
+                            status=HTTPStatus.OK)
+            messages.error(request, "Some of the products are not available in any shop")
     else: 
         order_form = OrderInformationForm()
     return render(request,
@@ -245,11 +275,22 @@ def product_order_from_checkout(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def order_list(request: WSGIRequest) -> HttpResponse:
-    employee = Employee.objects.get(employee=request.user)
-    order_items = OrderItem.objects.filter(shop=employee.shop).all()
+    if not request.role.is_employee:
+        return render(request,
+                      'errors/404.html',
+                      status=HTTPStatus.NOT_FOUND)
+    order_items = OrderItem.objects.filter(shop_id=request.role.shop_id) \
+                                   .select_related('product', 'order_information')
+    order_filter = OrderQueueFilter(request.GET, queryset=order_items)
+    page = keyset_paginate(order_filter.qs,
+                           request,
+                           per_page=settings.ORDERS_PER_PAGE,
+                           ordering=ORDER_QUEUE_ORDERING)
     return render(request,
                   'order/orders_list.html',
-                  {'items': order_items},
+                  {'items': page,
+                   'page': page,
+                   'filter': order_filter},
                   status=HTTPStatus.OK)
 
 
@@ -257,18 +298,60 @@ def order_list(request: WSGIRequest) -> HttpResponse:
 def order_detail(request: WSGIRequest,
                  id: int) -> HttpResponse:
     order = OrderInformation.objects.get(pk=id)
-    order_items = OrderItem.objects.filter(order_information=order).all()
+    order_items = OrderItem.objects.filter(order_information=order).select_related('product')
     return render(request,
                   'order/order_detail.html',
                   {'order': order,
                    'order_items': order_items},
                   status=HTTPStatus.OK)
 
+@login_required
+def order_history(request: WSGIRequest) -> HttpResponse:
+    if request.role.shop_id is None:
+        return render(request,
+                      'errors/404.html',
+                      status=HTTPStatus.NOT_FOUND)
+    shop_items = ArchivedOrderItem.objects.filter(order=OuterRef('pk'),
+                                                  shop_id=request.role.shop_id)
+    orders = ArchivedOrder.objects.filter(Exists(shop_items))
+    history_filter = OrderHistoryFilter(request.GET, queryset=orders)
+    page = keyset_paginate(history_filter.qs,
+                           request,
+                           per_page=settings.ORDER_HISTORY_PER_PAGE,
+                           ordering=ORDER_HISTORY_ORDERING)
+    return render(request,
+                  'order/order_history.html',
+                  {'orders': page,
+                   'page': page,
+                   'filter': history_filter},
+                  status=HTTPStatus.OK)
+
+
+@login_required
+def order_history_detail(request: WSGIRequest,
+                         id: int) -> HttpResponse:
+    if request.role.shop_id is None:
+        return render(request,
+                      'errors/404.html',
+                      status=HTTPStatus.NOT_FOUND)
+    order = get_object_or_404(ArchivedOrder, pk=id)
+    order_items = list(ArchivedOrderItem.objects.filter(order=order,
+                                                        shop_id=request.role.shop_id)
+                                                .order_by('id'))
+    if not order_items:
+        return render(request,
+                      'errors/404.html',
+                      status=HTTPStatus.NOT_FOUND)
+    return render(request,
+                  'order/order_history_detail.html',
+                  {'order': order,
+                   'order_items': order_items},
+                  status=HTTPStatus.OK)
+
 @login_required 
 def order_magazine_check(request: WSGIRequest,
                          id: int) -> HttpResponse: 
-    employee = Employee.objects.get(employee=request.user)
-    shop = Shop.objects.get(id=employee.shop.id)
+    shop = request.role.shop
     magazines = [magazine for magazine in shop.magazine.iterator()]
     return render(request,
                   'order/order_magazine_check.html',
@@ -278,29 +361,14 @@ def order_magazine_check(request: WSGIRequest,
 @login_required 
 def order_resolve(request: WSGIRequest, 
                   id: int) -> HttpResponse: 
-    employee = Employee.objects.get(employee=request.user)
-    shop = Shop.objects.get(id=employee.shop.id)
-    order = OrderInformation.objects.get(pk=id)
-    order_items = OrderItem.objects.filter(order_information=order).all()
-    magazines = [magazine for magazine in shop.magazine.iterator()]
-
-    for order_item, magazine in product(order_items, magazines): 
-        if magazine.assortment.filter(product=order_item.product).exists():
-            if order_item.quantity == 0: 
-                continue 
-            magazine_assortment = magazine.assortment.filter(product=order_item.product).first()
-            assortment_quantity = magazine_assortment.quantity   
-            if assortment_quantity > order_item.quantity:
-                assortment_quantity -= order_item.quantity
-                magazine_assortment.quantity = assortment_quantity 
-                order_item.quantity = 0 
-                order_item.save()
-                magazine_assortment.save() 
-
-    for order_item in order_items:
-        if order_item.quantity == 0: 
-            order_item.delete()     
-    messages.success(request, "Order has been sucessfully resolved")
+    shop = request.role.shop
+    order = get_object_or_404(OrderInformation, pk=id)
+    allocation = resolve_order(order, shop)
+    if allocation.is_complete:
+        messages.success(request, "Order has been sucessfully resolved")
+    else:
+        messages.warning(request,
+                         f"Order has been partially resolved, {len(allocation.pending)} items are waiting for stock")
     return redirect('order_list')
 
 
@@ -308,12 +376,18 @@ def order_resolve(request: WSGIRequest,
 def product_filter_list(request: WSGIRequest,
                         filter: str
                         ) -> HttpResponse:
-    products = Product.objects.filter(name__icontains=filter).all()
+    product_filter = ProductFilter({'name': filter},
+                                   queryset=Product.objects.all())
+    page = keyset_paginate(filter_in_stock(product_filter.qs, request),
+                           request,
+                           ordering=SEARCH_ORDERING)
     cart_product_form = CartAddProductForm()
-    if products.exists():
+    if page:
         return render(request,
                       'shop/products_list.html',
-                      {'products': products,
+                      {'products': page,
+                       'page': page,
+                       'in_stock': in_stock_requested(request),
                        'cart_product_form': cart_product_form},
                       status=HTTPStatus.OK)
     messages.error(request, "No products found")
@@ -324,12 +398,15 @@ def product_filter_list(request: WSGIRequest,
 def category_products_filter_list(request: WSGIRequest,
                                   category: str
                                   ) -> HttpResponse:
-    products = Product.objects.filter(category__name=category).all()
+    page = keyset_paginate(filter_in_stock(Product.objects.filter(category__name=category), request),
+                           request)
     cart_product_form = CartAddProductForm()
-    if products.exists():
+    if page:
         return render(request,
                       'shop/products_list.html',
-                      {'products': products,
+                      {'products': page,
+                       'page': page,
+                       'in_stock': in_stock_requested(request),
                        'cart_product_form': cart_product_form},
                       status=HTTPStatus.OK)
     messages.error(request, "No products found")
@@ -340,31 +417,29 @@ def category_products_filter_list(request: WSGIRequest,
 def producent_products_filter_list(request: WSGIRequest,
                                    producent: str
                                    ) -> HttpResponse:
-    shops = Shop.objects.filter(producent=producent).all()
-    products = []
+    page = keyset_paginate(filter_in_stock(Product.objects.filter(producentproduct__producent=producent),
+                                           request),
+                           request)
     cart_product_form = CartAddProductForm()
-    for shop in shops.iterator():
-        for magazine in shop.magazine.iterator():
-            for assortment in magazine.assortment.iterator():
-                products.append(assortment.product)
-    
-    if products:
+    if page:
         return render(request,
-                    'shop/products_list.html',
-                    {'products': products,
-                    'cart_product_form': cart_product_form},
-                    status=HTTPStatus.OK)
+                      'shop/products_list.html',
+                      {'products': page,
+                       'page': page,
+                       'in_stock': in_stock_requested(request),
+                       'cart_product_form': cart_product_form},
+                      status=HTTPStatus.OK)
 
     messages.error(request, "No products found from given producent")
     return redirect('dashboard')
 
 @login_required
 def employee_settings(request: WSGIRequest) -> HttpResponse:
-    if not is_employee(request.user):
+    if not request.role.is_employee:
         return render(request,
                       'errors/404.html',
                       status=HTTPStatus.NOT_FOUND)
-    employee = Employee.objects.get(employee=request.user)
+    employee = request.role.employee
     try:
         employee_profile = EmployeeProfile.objects.get(employee=employee)
     except EmployeeProfile.DoesNotExist: 
@@ -379,11 +454,11 @@ def employee_settings(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def owner_settings(request: WSGIRequest) -> HttpResponse:
-    if not is_owner(request.user): 
+    if not request.role.is_owner: 
         return render(request, 
                       'errors/404.html',
                       status=HTTPStatus.NOT_FOUND)
-    owner = Owner.objects.get(owner=request.user)
+    owner = request.role.owner
     try: 
         owner_profile = OwnerProfile.objects.get(owner=owner)
     except OwnerProfile.DoesNotExist: 
@@ -398,7 +473,7 @@ def owner_settings(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def employee_dashboard(request: WSGIRequest) -> HttpResponse:
-    if not is_employee(request.user): 
+    if not request.role.is_employee: 
         return render(request,
                       'errors/404.html',
                       status=HTTPStatus.NOT_FOUND)
@@ -409,11 +484,11 @@ def employee_dashboard(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def employee_edit(request: WSGIRequest) -> HttpResponse:
-    if not is_employee(request.user): 
+    if not request.role.is_employee: 
         return render(request,
                       'errors/404.html',
                       status=HTTPStatus.NOT_FOUND)
-    employee = Employee.objects.get(employee=request.user)
+    employee = request.role.employee
     if request.method == 'POST':
         employee_form = EmployeeEditForm(instance=employee.employee,
                                          files=request.FILES,
@@ -447,11 +522,11 @@ def employee_edit(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def owner_edit(request: WSGIRequest) -> HttpResponse:
-    if not is_owner(request.user): 
+    if not request.role.is_owner: 
         return render(request,
                       'errors/404.html',
                       status=HTTPStatus.NOT_FOUND)
-    owner = Owner.objects.get(owner=request.user)
+    owner = request.role.owner
     if request.method == 'POST':
         owner_form = OwnerEditForm(instance=owner.owner,
                                    files=request.FILES,
@@ -484,17 +559,35 @@ def owner_edit(request: WSGIRequest) -> HttpResponse:
 
 @login_required
 def owner_dashboard(request: WSGIRequest) -> HttpResponse:
-    if not is_owner(request.user):
+    if not request.role.is_owner:
         return render(request,
                       'errors/404.html',
                       status=HTTPStatus.NOT_FOUND)
-    owner = Owner.objects.get(owner=request.user)
+    owner = request.role.owner
     return render(request,
                   'shop/owner/owner_dashboard.html',
                   {'owner': owner},
                   status=HTTPStatus.OK)
 
 
+@login_required
+def owner_sales_report(request: WSGIRequest) -> HttpResponse:
+    if not request.role.is_owner:
+        return render(request,
+                      'errors/404.html',
+                      status=HTTPStatus.NOT_FOUND)
+    report_form = SalesReportForm(request.GET)
+    report = None
+    if report_form.is_valid():
+        cd: Dict = report_form.cleaned_data
+        report = sales_report(request.role.shop_id, cd['start'], cd['end'])
+    return render(request,
+                  'shop/owner/sales_report.html',
+                  {'form': report_form,
+                   'report': report},
+                  status=HTTPStatus.OK)
+
+
 @login_required
 @permission_required('shop.can_add_producent')
 def register_new_producent(request: WSGIRequest) -> HttpResponse:
@@ -584,8 +677,7 @@ def register_new_assortment(request: WSGIRequest) -> HttpResponse:
 @login_required
 @permission_required('shop.can_add_magazine')
 def register_new_magazine(request: WSGIRequest) -> HttpResponse:
-    owner = Owner.objects.get(owner=request.user)
-    shop = Shop.objects.get(name=owner.shop.name)
+    shop = request.role.shop
     if request.method == "POST":
         magazine_form = MagazineRegisterForm(request.POST)
         if magazine_form.is_valid():
@@ -669,11 +761,11 @@ def task_detail(request: WSGIRequest,
 @login_required
 @permission_required('shop.can_view_task')
 def task_list(request: WSGIRequest) -> HttpResponse:
-    if is_employee(request.user):
-        employee = Employee.objects.get(employee=request.user)
+    if request.role.is_employee:
+        employee = request.role.employee
         tasks = Task.objects.filter(task_to=employee).all()
-    if is_owner(request.user):
-        owner = Owner.objects.get(owner=request.user)
+    if request.role.is_owner:
+        owner = request.role.owner
         tasks = Task.objects.filter(task_from=owner).all()
     return render(request,
                   'shop/tasks/task_list.html',
@@ -684,8 +776,7 @@ def task_list(request: WSGIRequest) -> HttpResponse:
 @permission_required('shop.can_view_employee_list')
 def employee_list(request: WSGIRequest,
                   ) -> HttpResponse:
-    owner = Owner.objects.get(owner=request.user)
-    shop = Shop.objects.get(name=owner.shop.name)
+    shop = request.role.shop
     try:
         employees = Employee.objects.filter(shop__id=shop.id).all()
     except Employee.DoesNotExist: 
@@ -715,8 +806,7 @@ def delete_employee(request: WSGIRequest,
 def delete_producent(request: WSGIRequest,
                      name: str
                      ) -> HttpResponse:
-    owner = Owner.objects.get(owner=request.user)
-    shop = Shop.objects.get(name=owner.shop.name)
+    shop = request.role.shop
     try: 
         shop.producent.get(name=name).delete()
         shop.save()
@@ -732,8 +822,7 @@ def delete_producent(request: WSGIRequest,
 def delete_producent(request: WSGIRequest,
                      name: str
                      ) -> HttpResponse:
-    owner = Owner.objects.get(owner=request.user)
-    shop = Shop.objects.get(name=owner.shop.name)
+    shop = request.role.shop
     try: 
         shop.producent.get(name=name).delete()
         shop.save()
@@ -749,8 +838,7 @@ def delete_producent(request: WSGIRequest,
 def delete_magazine(request: WSGIRequest, 
                     address: str
                     ) -> HttpResponse: 
-    owner = Owner.objects.get(owner=request.user)
-    shop = Shop.objects.get(name=owner.shop.name)
+    shop = request.role.shop
     try: 
         shop.magazine.get(address=address).delete()
         shop.save()
@@ -764,8 +852,7 @@ def delete_magazine(request: WSGIRequest,
 @login_required
 @permission_required('shop.can_view_shop_assets')
 def shop_assets(request: WSGIRequest) -> HttpResponse: 
-    owner = Owner.objects.get(owner=request.user)
-    shop = Shop.objects.get(name=owner.shop.name)
+    shop = request.role.shop
     return render(request, 
                   'shop/owner/shop_assets.html',
                   {'shop': shop},